@@ -1,23 +1,107 @@
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from .const import DOMAIN, DEFAULT_POLL_INTERVAL
+from homeassistant.helpers.storage import Store
+from .const import (
+    DOMAIN,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL_MAX,
+    DEFAULT_STALE_GRACE,
+    POWER_FILTER_KEYS,
+    STORAGE_VERSION,
+)
+from .coordinator import APICoordinator
+from .hub import MaxxisunHub
+from .services import async_setup_services, async_unload_services
+
+PLATFORMS = ["sensor", "number", "select"]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
+    # Domain-wide hub: staggered polls, shared request budget and one token
+    # manager per account for all entries
+    hub = hass.data[DOMAIN].get("hub")
+    if hub is None:
+        hub = hass.data[DOMAIN]["hub"] = MaxxisunHub(hass)
+    token_manager = hub.async_get_token_manager(entry)
+
+    data = hass.data[DOMAIN][entry.entry_id] = {
         "email": entry.data.get("email"),
         "ccu": entry.data.get("ccu"),
         "token": entry.data.get("token"),
+        "token_manager": token_manager,
+        "hub": hub,
         "API_POLL_INTERVAL": entry.data.get("API_POLL_INTERVAL", DEFAULT_POLL_INTERVAL),
         "ignoreSSL": entry.data.get("ignoreSSL"),
+        "adaptivePolling": entry.data.get("adaptivePolling", False),
+        "API_POLL_INTERVAL_MAX": entry.data.get("API_POLL_INTERVAL_MAX", DEFAULT_POLL_INTERVAL_MAX),
+        "options": dict(entry.options),
+        # Last telemetry/config for entities right after a restart
+        "store": Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"),
     }
-    await hass.config_entries.async_forward_entry_setups(entry, ["sensor", "number", "select"])
+
+    # One coordinator and one first refresh per entry, shared by all platforms
+    coordinator = data["coordinator"] = APICoordinator(
+        hass=hass,
+        session=hub.async_get_session(bool(entry.data.get("ignoreSSL"))),
+        token_manager=token_manager,
+        api_poll_interval=int(data["API_POLL_INTERVAL"]),
+        adaptive_polling=data["adaptivePolling"],
+        api_poll_interval_max=int(data["API_POLL_INTERVAL_MAX"]),
+        hub=hub,
+        store=data["store"],
+        stale_grace=int(entry.options.get("stale_grace", DEFAULT_STALE_GRACE)),
+        statistics_keys=tuple(key for key in POWER_FILTER_KEYS if entry.options.get(f"{key}_statistics_only")),
+    )
+    try:
+        # Raises ConfigEntryNotReady (HA retries the setup) or ConfigEntryAuthFailed
+        await coordinator.async_start(entry)
+    except Exception:
+        hub.async_unregister(coordinator)
+        hass.data[DOMAIN].pop(entry.entry_id)
+        raise
+
+    async_setup_services(hass)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    # Platforms only build entities from the shared coordinator, set up concurrently
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload the entry so changed options take effect."""
+    data = hass.data[DOMAIN].get(entry.entry_id)
+    if data is not None and _without_presets(data.get("options")) == _without_presets(entry.options):
+        # Data-only update (e.g. a refreshed token) or edited presets, which
+        # the apply_config service reads from the entry on every call
+        data["options"] = dict(entry.options)
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _without_presets(options) -> dict:
+    return {key: value for key, value in (options or {}).items() if key != "presets"}
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor", "number", "select"])
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = data.get("coordinator")
+        if coordinator:
+            # Stop the coordinator's refresh timer so reloads never stack pollers
+            await coordinator.async_shutdown()
+            # Persist the latest snapshot for the next setup (reload, restart)
+            await coordinator.async_save()
+            data["hub"].async_unregister(coordinator)
+        if data["hub"].idle:
+            # Last entry gone: close the HTTP sessions, drop the services
+            await data["hub"].async_close()
+            async_unload_services(hass)
+            hass.data[DOMAIN].pop("hub", None)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Delete the persisted snapshot of a removed entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
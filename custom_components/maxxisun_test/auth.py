@@ -0,0 +1,127 @@
+import asyncio
+import base64
+import contextlib
+import json
+import logging
+import time
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from .const import API_BASE_URL, DOMAIN, TOKEN_REFRESH_MARGIN
+
+_LOGGER = logging.getLogger(__name__)
+
+class AuthFailed(Exception):
+    """The API rejected the login."""
+
+
+class NoToken(AuthFailed):
+    """The login response did not contain a JWT."""
+
+
+class Unauthorized(Exception):
+    """A request was answered with HTTP 401."""
+
+
+def jwt_expiry(token: str | None) -> float | None:
+    """Return the JWT's exp claim (epoch seconds), None if it has none."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+async def async_login(session: aiohttp.ClientSession, email: str, ccu: str) -> str:
+    """Log in via /api/authentication/log-in and return the JWT.
+
+    session is a client.create_session() session, it carries the headers,
+    timeouts and SSL setting.
+    """
+    login_url = f"{API_BASE_URL}/api/authentication/log-in"
+    async with session.post(login_url, json={"email": email, "ccu": ccu}) as resp:
+        if resp.status == 429 or resp.status >= 500:
+            # Outage or throttling, not a rejected login: no reauth for this
+            raise aiohttp.ClientResponseError(
+                resp.request_info, resp.history, status=resp.status, message="Login unavailable"
+            )
+        if resp.status not in (200, 202):
+            raise AuthFailed(f"HTTP {resp.status}")
+        data = await resp.json()
+    token = data.get("jwt") if isinstance(data, dict) else None
+    if not token:
+        raise NoToken("Login response without jwt")
+    return token
+
+
+class TokenManager:
+    """Keeps the JWT of one account (email + CCU) valid.
+
+    Shared by all coordinators of that account, so concurrent pollers and
+    writers wait for the same re-login instead of each logging in.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session,
+        email: str,
+        ccu: str,
+        token: str | None,
+        request_slot=None,
+    ):
+        self._hass = hass
+        # Optional gate (the hub's request budget) for login requests
+        self._request_slot = request_slot or contextlib.nullcontext
+        self._session = session
+        self._email = email
+        self._ccu = ccu
+        self._token = token
+        self._expires_at = jwt_expiry(token)
+        self._lock = asyncio.Lock()
+
+    @property
+    def token(self) -> str | None:
+        return self._token
+
+    def update_token(self, token: str | None) -> None:
+        """Adopt a token from the config entry if it lives longer than ours."""
+        if not token or token == self._token:
+            return
+        expires_at = jwt_expiry(token)
+        if self._expires_at is None or (expires_at is not None and expires_at > self._expires_at):
+            self._token, self._expires_at = token, expires_at
+
+    def _expiring(self) -> bool:
+        if not self._token:
+            return True
+        if self._expires_at is None:
+            return False
+        return time.time() >= self._expires_at - TOKEN_REFRESH_MARGIN
+
+    async def async_get_token(self) -> str:
+        """Return a valid token, logging in again shortly before it expires."""
+        if self._expiring():
+            return await self.async_refresh(self._token)
+        return self._token
+
+    async def async_refresh(self, failed_token: str | None) -> str:
+        """Log in again unless another caller already replaced failed_token."""
+        async with self._lock:
+            if self._token and self._token != failed_token:
+                return self._token
+            _LOGGER.debug("Refreshing token for CCU %s", self._ccu)
+            async with self._request_slot():
+                token = await async_login(self._session, self._email, self._ccu)
+            self._token, self._expires_at = token, jwt_expiry(token)
+            self._async_persist()
+            return token
+
+    def _async_persist(self) -> None:
+        """Write the new token back to every config entry of this account."""
+        for entry in self._hass.config_entries.async_entries(DOMAIN):
+            if entry.data.get("email") == self._email and entry.data.get("ccu") == self._ccu:
+                if entry.data.get("token") != self._token:
+                    self._hass.config_entries.async_update_entry(entry, data={**entry.data, "token": self._token})
@@ -0,0 +1,43 @@
+import aiohttp
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import get_default_context
+
+from .const import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_SIZE,
+    HTTP_READ_TIMEOUT,
+    HTTP_TOTAL_TIMEOUT,
+)
+
+# Sent with every request; only Authorization is added per call
+DEFAULT_HEADERS = {
+    "User-Agent": f"{SERVER_SOFTWARE} maxxisun_test",
+    "Accept": "application/json, text/plain, */*",
+    # Only what aiohttp decompresses without optional packages
+    "Accept-Encoding": "gzip, deflate",
+}
+
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(
+    total=HTTP_TOTAL_TIMEOUT,
+    connect=HTTP_CONNECT_TIMEOUT,
+    sock_read=HTTP_READ_TIMEOUT,
+)
+
+
+def create_session(ignore_ssl: bool) -> aiohttp.ClientSession:
+    """Create the HTTP session used for the Maxxisun API.
+
+    Own connection pool for the single API host: connections are kept alive
+    across polls, DNS answers are cached, and certificate verification is
+    turned off at the connector when ignoreSSL is set. The caller closes it.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_SIZE,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        ssl=False if ignore_ssl else get_default_context(),
+    )
+    return aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS, timeout=DEFAULT_TIMEOUT)
@@ -1,8 +1,23 @@
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 import aiohttp
-from .const import DOMAIN, API_BASE_URL, DEFAULT_POLL_INTERVAL
+from .auth import AuthFailed, NoToken, async_login
+from .client import create_session
+from .const import (
+    CONTROL_NUMBER_MAP,
+    CONTROL_SELECT_MAP,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL_MAX,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_STALE_GRACE,
+    DEFAULT_STATISTICS_STATE_INTERVAL,
+    DOMAIN,
+    POWER_FILTER_KEYS,
+)
+from .models import number_bounds, validate_config_fields
 
 DATA_SCHEMA = vol.Schema(
     {
@@ -12,6 +27,10 @@ DATA_SCHEMA = vol.Schema(
             vol.Coerce(int), vol.Range(min=5, max=600)
         ),
         vol.Required("ignoreSSL"): bool,
+        vol.Optional("adaptivePolling", default=False): bool,
+        vol.Optional("API_POLL_INTERVAL_MAX", default=DEFAULT_POLL_INTERVAL_MAX): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=600)
+        ),
     }
 )
 
@@ -19,40 +38,29 @@ DATA_SCHEMA = vol.Schema(
 class RestConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return RestOptionsFlow()
+
     async def async_step_user(self, user_input=None):
         if user_input is not None:
-            session = async_get_clientsession(self.hass)
-            login_url = f"{API_BASE_URL}/api/authentication/log-in"
-            headers = {
-                "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Encoding": "gzip, deflate, br, zstd",
-                "Content-Type": "application/json",
-            }
-
             try:
-                ssL = False if user_input["ignoreSSL"] else None
-                async with session.post(
-                    login_url,
-                    data='{"email":"' + user_input["email"] + '","ccu":"' + user_input["ccu"] + '"}',
-                    headers=headers,
-                    ssl=ssL,
-                ) as resp:
-                    if resp.status not in (200, 202):
-                        return self.async_show_form(
-                            step_id="user",
-                            data_schema=DATA_SCHEMA,
-                            errors={"base": "auth_failed"},
-                        )
-                    data = await resp.json()
-                    token = data.get("jwt")
-                    if not token:
-                        return self.async_show_form(
-                            step_id="user",
-                            data_schema=DATA_SCHEMA,
-                            errors={"base": "no_token"},
-                        )
-            except aiohttp.ClientError:
+                async with create_session(user_input["ignoreSSL"]) as session:
+                    token = await async_login(session, user_input["email"], user_input["ccu"])
+            except NoToken:
+                return self.async_show_form(
+                    step_id="user",
+                    data_schema=DATA_SCHEMA,
+                    errors={"base": "no_token"},
+                )
+            except AuthFailed:
+                return self.async_show_form(
+                    step_id="user",
+                    data_schema=DATA_SCHEMA,
+                    errors={"base": "auth_failed"},
+                )
+            except (aiohttp.ClientError, TimeoutError):
                 return self.async_show_form(
                     step_id="user",
                     data_schema=DATA_SCHEMA,
@@ -67,7 +75,117 @@ class RestConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     "API_POLL_INTERVAL": user_input["API_POLL_INTERVAL"],
                     "token": token,
                     "ignoreSSL": user_input["ignoreSSL"],
+                    "adaptivePolling": user_input["adaptivePolling"],
+                    "API_POLL_INTERVAL_MAX": user_input["API_POLL_INTERVAL_MAX"],
                 },
             )
 
         return self.async_show_form(step_id="user", data_schema=DATA_SCHEMA)
+
+    async def async_step_reauth(self, entry_data):
+        """Started by the coordinator when the automatic re-login failed."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        entry = self._get_reauth_entry()
+        errors = {}
+        if user_input is not None:
+            try:
+                async with create_session(bool(entry.data.get("ignoreSSL"))) as session:
+                    token = await async_login(session, entry.data["email"], entry.data["ccu"])
+            except NoToken:
+                errors["base"] = "no_token"
+            except AuthFailed:
+                errors["base"] = "auth_failed"
+            except (aiohttp.ClientError, TimeoutError):
+                errors["base"] = "cannot_connect"
+            else:
+                return self.async_update_reload_and_abort(entry, data_updates={"token": token})
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            description_placeholders={"ccu": entry.data.get("ccu")},
+            errors=errors,
+        )
+
+
+def _preset_schema() -> vol.Schema:
+    """Name plus every writable config field, all fields optional."""
+    schema = {vol.Required("name"): str}
+    for field, (_tk, _unit, _icon, is_writable) in CONTROL_NUMBER_MAP.items():
+        if is_writable:
+            schema[vol.Optional(field)] = vol.All(vol.Coerce(int), vol.Range(*number_bounds(field)))
+    for field, (_tk, _unit, _icon, is_writable, options) in CONTROL_SELECT_MAP.items():
+        if is_writable:
+            schema[vol.Optional(field)] = vol.In([str(item["Key"]) for item in options])
+    return vol.Schema(schema)
+
+
+class RestOptionsFlow(config_entries.OptionsFlow):
+    """Options: state write filters and statistics-only mode for the power
+    sensors, stale data grace window and the config presets of the
+    apply_config service."""
+
+    async def async_step_init(self, user_input=None):
+        menu = ["settings", "add_preset"]
+        if self.config_entry.options.get("presets"):
+            menu.append("remove_preset")
+        return self.async_show_menu(step_id="init", menu_options=menu)
+
+    def _save(self, **changes):
+        """Store changed options, keeping all others."""
+        return self.async_create_entry(data={**self.config_entry.options, **changes})
+
+    async def async_step_add_preset(self, user_input=None):
+        """Store the entered fields as a named preset (replaces one of the same name)."""
+        errors = {}
+        if user_input is not None:
+            name = user_input.pop("name").strip()
+            if not name:
+                errors["name"] = "preset_name"
+            elif not user_input:
+                errors["base"] = "preset_empty"
+            else:
+                presets = dict(self.config_entry.options.get("presets", {}))
+                # Select keys are stored as the values the API expects
+                presets[name] = validate_config_fields(user_input)
+                return self._save(presets=presets)
+        return self.async_show_form(step_id="add_preset", data_schema=_preset_schema(), errors=errors)
+
+    async def async_step_remove_preset(self, user_input=None):
+        presets = dict(self.config_entry.options.get("presets", {}))
+        if user_input is not None:
+            for name in user_input["presets"]:
+                presets.pop(name, None)
+            return self._save(presets=presets)
+        return self.async_show_form(
+            step_id="remove_preset",
+            data_schema=vol.Schema({vol.Required("presets"): cv.multi_select(sorted(presets))}),
+        )
+
+    async def async_step_settings(self, user_input=None):
+        if user_input is not None:
+            return self._save(**user_input)
+
+        options = self.config_entry.options
+        schema = {}
+        for key in POWER_FILTER_KEYS:
+            schema[
+                vol.Optional(f"{key}_deadband", default=options.get(f"{key}_deadband", DEFAULT_POWER_DEADBAND))
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=1000))
+            schema[
+                vol.Optional(f"{key}_min_interval", default=options.get(f"{key}_min_interval", DEFAULT_MIN_WRITE_INTERVAL))
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=3600))
+            schema[
+                vol.Optional(f"{key}_statistics_only", default=options.get(f"{key}_statistics_only", False))
+            ] = bool
+        schema[
+            vol.Optional(
+                "statistics_state_interval",
+                default=options.get("statistics_state_interval", DEFAULT_STATISTICS_STATE_INTERVAL),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=30, max=3600))
+        schema[
+            vol.Optional("stale_grace", default=options.get("stale_grace", DEFAULT_STALE_GRACE))
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=3600))
+        return self.async_show_form(step_id="settings", data_schema=vol.Schema(schema))
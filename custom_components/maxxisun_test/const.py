@@ -7,6 +7,74 @@ from homeassistant.components.sensor import (
 DOMAIN = "maxxisun_test"
 API_BASE_URL = "https://maxxisun.app:3000"
 DEFAULT_POLL_INTERVAL: int = 30
+# Device config rarely changes, refresh it on a slower cadence than telemetry
+CONFIG_POLL_INTERVAL: int = 300
+# Config field changes arriving within this many seconds are sent as one PUT
+CONFIG_WRITE_DEBOUNCE: float = 0.5
+# Log in again this many seconds before the JWT's exp claim
+TOKEN_REFRESH_MARGIN: int = 300
+# Last telemetry/config is persisted per entry for instant startup, written at
+# most once per STORAGE_SAVE_DELAY seconds and when the entry is unloaded
+STORAGE_VERSION: int = 1
+STORAGE_SAVE_DELAY: int = 60
+# HTTP client: per-request timeouts (s), pool and keep-alive for the API host.
+# Each poll request must finish within POLL_TIMEOUT_FRACTION
+# of the poll interval, at most HTTP_TOTAL_TIMEOUT. Connections are kept
+# alive longer than the longest (adaptive) poll interval.
+HTTP_CONNECT_TIMEOUT: float = 5
+HTTP_READ_TIMEOUT: float = 10
+HTTP_TOTAL_TIMEOUT: float = 20
+POLL_TIMEOUT_FRACTION: float = 0.8
+HTTP_POOL_SIZE: int = 8
+HTTP_KEEPALIVE_TIMEOUT: float = 130
+HTTP_DNS_CACHE_TTL: int = 300
+# Poll retries: up to RETRY_ATTEMPTS tries with full-jitter exponential
+# backoff (RETRY_BASE_DELAY * 2^n s, at most RETRY_MAX_DELAY), all within the
+# poll's request budget.
+RETRY_ATTEMPTS: int = 3
+RETRY_BASE_DELAY: float = 0.5
+RETRY_MAX_DELAY: float = 4.0
+# Circuit breaker: from CIRCUIT_FAILURE_THRESHOLD failed polls in a row on the
+# interval doubles with every further failure, up to CIRCUIT_MAX_INTERVAL.
+CIRCUIT_FAILURE_THRESHOLD: int = 3
+CIRCUIT_MAX_INTERVAL: int = 900
+# Failed polls keep serving the last good data for this many seconds (option)
+DEFAULT_STALE_GRACE: int = 300
+# Request statistics keep latencies of this many requests/polls per endpoint
+STATS_WINDOW: int = 200
+
+# Adaptive polling: the interval is halved down to ADAPTIVE_MIN_INTERVAL while
+# power/SOC move fast and stretched up to API_POLL_INTERVAL_MAX while idle.
+DEFAULT_POLL_INTERVAL_MAX: int = 120
+ADAPTIVE_MIN_INTERVAL: int = 5
+ADAPTIVE_GROWTH_FACTOR: float = 1.5
+ADAPTIVE_ACTIVE_DELTA = {"Pccu": 100.0, "Pr": 100.0, "PV_power_total": 100.0, "SOC": 1.0}
+ADAPTIVE_IDLE_DELTA = {"Pccu": 10.0, "Pr": 10.0, "PV_power_total": 10.0, "SOC": 0.5}
+# Device uploads: their period is learned from the "date" gaps seen while
+# polls are faster than the uploads (UPLOAD_MIN_SAMPLES of the last
+# UPLOAD_HISTORY), their readable delay from every new sample. Polls are then
+# placed UPLOAD_MARGIN s after the first upload expected at least one poll
+# interval away (HA shifts a refresh by less than 1 s).
+UPLOAD_HISTORY: int = 16
+UPLOAD_MIN_SAMPLES: int = 4
+UPLOAD_MARGIN: float = 1.0
+
+# Hub shared by all entries: concurrent requests, requests-per-minute budget
+# (with burst) and the lateness (fraction of the interval) counted as a missed
+# poll deadline.
+HUB_MAX_CONCURRENT_REQUESTS: int = 8
+HUB_REQUESTS_PER_MINUTE: int = 600
+HUB_REQUEST_BURST: int = 20
+HUB_DEADLINE_TOLERANCE: float = 0.5
+
+# State write filters for the power sensors, configurable in the options flow:
+# deadband in W and minimum seconds between two state writes (0 = off).
+POWER_FILTER_KEYS = ("Pccu", "Pr", "PV_power_total", "PowerBattery")
+DEFAULT_POWER_DEADBAND: int = 0
+DEFAULT_MIN_WRITE_INTERVAL: int = 0
+# Statistics-only mode per power sensor: hourly mean/min/max are written as
+# external statistics from every sample, the state only every N seconds.
+DEFAULT_STATISTICS_STATE_INTERVAL: int = 300
 
 # region Conf
 LANG_DE: Final = "de"
@@ -20,6 +88,128 @@ SENSOR_MAP = {
     "PV_power_total": ("pv_power_total", "W", "mdi:solar-power-variant", False, SensorStateClass.MEASUREMENT, SensorDeviceClass.POWER),
     "firmwareVersion": ("firmware_version", None, "mdi:information-outline", False, None, None),
 }
+# Per-index sensors of the telemetry arrays:
+# field -> (translation_key, unit, icon, stateClass, deviceClass).
+# Other scalar fields found in the payload get a generic sensor that is
+# disabled by default (ARRAY_GENERIC_TRANSLATION).
+ARRAY_SENSOR_MAP = {
+    "convertersInfo": {
+        "version": ("converter_version", None, "mdi:information-outline", None, None),
+    },
+    "batteriesInfo": {
+        "batteryCapacity": ("battery_capacity", "Wh", "mdi:battery", None, None),
+    },
+}
+ARRAY_GENERIC_TRANSLATION = {
+    "convertersInfo": "converter_field",
+    "batteriesInfo": "battery_field",
+}
+# An index/field missing from this many new samples in a row retires its
+# sensor. A payload without the array (or not a list) counts as unknown.
+ARRAY_RETIRE_SAMPLES: int = 3
+# Derived sensors, evaluated once per poll in this order (models.py):
+# key -> (translation_key, unit, icon, expression, precision, stateClass, deviceClass, enabled_default).
+# An expression is a number, a name (telemetry field, missing = 0, or an
+# earlier derived key) or a tuple (op, *args):
+#   add / sub / mul / div / min / max   on two expressions (div by 0 = None)
+#   array_sum / array_min / array_max   over (array key, field)
+#   sign                                (expression, (negative, zero, positive))
+#   soc_icon                            battery icon for an expression in %
+# icon is a fixed icon or an expression giving one. precision: 0 = int,
+# n = n decimals, None = unchanged. Any invalid input makes the value None.
+BATTERY_FLOW_ICONS = ("mdi:battery-arrow-down-outline", "mdi:battery-outline", "mdi:battery-arrow-up-outline")
+DERIVED_SENSOR_MAP = {
+    "PowerBattery": (
+        "power_battery",
+        "W",
+        ("sign", "PowerBattery", BATTERY_FLOW_ICONS),
+        ("sub", "PV_power_total", "Pccu"),
+        0,
+        SensorStateClass.MEASUREMENT,
+        SensorDeviceClass.POWER,
+        True,
+    ),
+    "BatteryCharging": (
+        "battery_charging",
+        None,
+        ("sign", "PowerBattery", BATTERY_FLOW_ICONS),
+        ("sign", "PowerBattery", ("Discharging", "Idle", "Charging")),
+        None,
+        None,
+        None,
+        True,
+    ),
+    "BatteryCapacity": (
+        "battery_capacity_total",
+        "Wh",
+        ("soc_icon", "SOC"),
+        ("array_sum", "batteriesInfo", "batteryCapacity"),
+        0,
+        None,
+        None,
+        True,
+    ),
+    "GridExport": (
+        "grid_export",
+        "W",
+        "mdi:transmission-tower-import",
+        ("max", ("sub", 0, "Pr"), 0),
+        0,
+        SensorStateClass.MEASUREMENT,
+        SensorDeviceClass.POWER,
+        False,
+    ),
+    "SelfSufficiency": (
+        "self_sufficiency",
+        "%",
+        "mdi:home-lightning-bolt-outline",
+        ("mul", 100, ("div", "Pccu", ("add", "Pccu", ("max", "Pr", 0)))),
+        0,
+        SensorStateClass.MEASUREMENT,
+        None,
+        False,
+    ),
+}
+# Energy totals (kWh) integrated by the coordinator from every sample:
+# key -> (translation_key, power source, direction, icon). The source is a
+# telemetry field or DERIVED_SENSOR_MAP key in W; direction 1 counts the
+# positive, -1 the negative part (Pr > 0 is import, PowerBattery > 0 charging).
+ENERGY_SENSOR_MAP = {
+    "EnergyGridImport": ("energy_grid_import", "Pr", 1, "mdi:transmission-tower-export"),
+    "EnergyGridExport": ("energy_grid_export", "Pr", -1, "mdi:transmission-tower-import"),
+    "EnergyPV": ("energy_pv", "PV_power_total", 1, "mdi:solar-power-variant"),
+    "EnergyOutput": ("energy_output", "Pccu", 1, "mdi:power-plug-battery-outline"),
+    "EnergyBatteryCharge": ("energy_battery_charge", "PowerBattery", 1, "mdi:battery-arrow-up-outline"),
+    "EnergyBatteryDischarge": ("energy_battery_discharge", "PowerBattery", -1, "mdi:battery-arrow-down-outline"),
+}
+# Samples further apart than this (s) are not integrated (outage, restart)
+ENERGY_MAX_GAP: int = 900
+# Rolling windows (name -> s) over the recent samples of ROLLING_KEYS
+# (telemetry fields or DERIVED_SENSOR_MAP keys), shown as min_/max_/mean_<name>
+# attributes of their sensors. Each key keeps a ring buffer sized for the
+# longest window at ADAPTIVE_MIN_INTERVAL, faster samples shorten the window.
+ROLLING_KEYS = ("Pccu", "Pr", "PV_power_total", "PowerBattery", "SOC")
+ROLLING_WINDOWS = {"15m": 900, "1h": 3600}
+# Optional sensors on a rolling aggregate (disabled by default):
+# key -> (translation_key, source, window, aggregate (min / max / mean), icon)
+ROLLING_SENSOR_MAP = {
+    "GridImportPeak15m": ("grid_import_peak_15m", "Pr", "15m", "max", "mdi:transmission-tower-export"),
+    "PVPowerMean1h": ("pv_power_mean_1h", "PV_power_total", "1h", "mean", "mdi:solar-power-variant"),
+    "PowerOutMean1h": ("power_out_mean_1h", "Pccu", "1h", "mean", "mdi:power-plug-battery-outline"),
+}
+# Battery runtime estimates: the SOC rate (%/h) is the least-squares slope of
+# SOC over the rolling window ESTIMATE_WINDOW, or the mean PowerBattery over
+# BatteryCapacity while SOC did not move, smoothed exponentially with a time
+# constant of ESTIMATE_SMOOTHING s. Rates below ESTIMATE_MIN_RATE count as idle.
+ESTIMATE_WINDOW = "15m"
+ESTIMATE_SMOOTHING: int = 300
+ESTIMATE_MIN_RATE: float = 0.2
+# key -> (translation_key, config field with the target SOC, direction, icon)
+ESTIMATE_SENSOR_MAP = {
+    "TimeToMaxSOC": ("time_to_max_soc", "maxSOC", 1, "mdi:battery-clock"),
+    "TimeToMinSOC": ("time_to_min_soc", "minSOC", -1, "mdi:battery-clock-outline"),
+}
+
 CONTROL_NUMBER_MAP = {
     "numberOfBatteries": ("number_of_batteries", None, "mdi:battery-plus-outline", True),
     "minSOC": ("min_soc", "%", "mdi:percent", True),
@@ -68,3 +258,7 @@ CONTROL_SELECT_MAP = {
 CONTROL_DIAGNOSTIC_MAP = {
     "meterIp": ("meter_ip", None, "mdi:ip-network-outline", False),
 }
+# Alternate spellings of config fields seen in API responses
+CONFIG_FIELD_ALIASES = {
+    "meterIp": ("meterIP",),
+}
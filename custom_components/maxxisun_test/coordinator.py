@@ -1,28 +1,150 @@
+import asyncio
+import contextlib
+import hashlib
 import logging
+import math
+import random
+import time
 from datetime import timedelta
 
 import aiohttp
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util.json import json_loads, json_loads_object
 
-from .const import API_BASE_URL, CONTROL_NUMBER_MAP, CONTROL_SELECT_MAP, CONTROL_DIAGNOSTIC_MAP
+from .const import (
+    ADAPTIVE_ACTIVE_DELTA,
+    ADAPTIVE_GROWTH_FACTOR,
+    ADAPTIVE_IDLE_DELTA,
+    ADAPTIVE_MIN_INTERVAL,
+    API_BASE_URL,
+    CONFIG_POLL_INTERVAL,
+    CONFIG_WRITE_DEBOUNCE,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_MAX_INTERVAL,
+    CONTROL_DIAGNOSTIC_MAP,
+    CONTROL_NUMBER_MAP,
+    CONTROL_SELECT_MAP,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_TOTAL_TIMEOUT,
+    POLL_TIMEOUT_FRACTION,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    STORAGE_SAVE_DELAY,
+)
+from .auth import AuthFailed, TokenManager, Unauthorized
+from .energy import EnergyIntegrator
+from .estimate import RuntimeEstimator
+from .longterm import HourlyStatistics, async_import_hourly
+from .models import DeviceConfig, TelemetrySnapshot, config_key, project_telemetry
+from .rolling import RollingStats
+from .stats import RequestStats
+from .upload import UploadTracker
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class TransientError(UpdateFailed):
+    """Server-side error (HTTP 5xx), worth retrying."""
+
+
 class APICoordinator(DataUpdateCoordinator):
     """Koordiniert API-Zugriffe: Device-Daten und Config-GET/PUT."""
 
-    def __init__(self, hass, session, token, api_poll_interval: int, ignoreSSL: bool = False):
+    def __init__(
+        self,
+        hass,
+        session,
+        token_manager: TokenManager,
+        api_poll_interval: int,
+        adaptive_polling: bool = False,
+        api_poll_interval_max: int | None = None,
+        hub=None,
+        store: Store | None = None,
+        stale_grace: float = 0,
+        statistics_keys: tuple[str, ...] = (),
+    ):
+        # client.create_session() session: headers, timeouts and SSL mode
         self._session = session
-        self._token = token
-        self.config = None
+        self._headers_token: str | None = None
+        self._headers: dict = {}
+        # Timeout of poll requests, derived from the poll's remaining budget
+        self._poll_timeout = aiohttp.ClientTimeout()
+        # Outages: failed polls in a row (circuit breaker) and the grace window
+        # (s) in which the last good data is served instead of failing
+        self._failures = 0
+        self._stale_grace = float(stale_grace)
+        self._last_success_at: float | None = None
+        self.stale = False
+        # Persisted snapshot of the last poll, served until the first live refresh
+        self._store = store
+        self.restored = False
+        # Loop time the armed delayed save writes at: saves follow at a fixed
+        # rate instead of re-arming (and never firing) with every sample
+        self._save_at: float | None = None
+        # Domain hub: staggered poll phases and a shared request budget
+        self._hub = hub
+        self._next_poll_at: float | None = None
+        self._token_manager = token_manager
+        # Typed config, replaced (version + 1) whenever a fetch or write
+        # returned a different payload; listeners are keyed per field
+        self.config: DeviceConfig | None = None
         self._device_id = None
-        # When ignoreSSL=True, disable certificate verification for aiohttp requests
-        # by passing ssl=False to calls. Otherwise, leave default verification behavior.
-        self._ssl = False if ignoreSSL else None
+        # Config is polled on its own, slower cadence. It is refetched when
+        # CONFIG_POLL_INTERVAL has elapsed or when a write left it stale.
+        self._config_stale = True
+        self._config_fetched_at: float | None = None
+        self._config_etag: str | None = None
+        self._config_last_modified: str | None = None
+        self._config_hash: str | None = None
+        # Config writes: fields arriving within CONFIG_WRITE_DEBOUNCE are merged
+        # into one PUT, PUTs are serialized, values are shown optimistically.
+        self._pending_writes: dict = {}
+        self._optimistic: dict = {}
+        self._write_future: asyncio.Future | None = None
+        self._write_lock = asyncio.Lock()
+        # Adaptive polling shortens/stretches update_interval based on the deltas
+        # between the last two telemetry samples.
+        self._adaptive_polling = adaptive_polling
+        self._base_interval = float(api_poll_interval)
+        self._interval = float(api_poll_interval)
+        self._min_interval = float(min(ADAPTIVE_MIN_INTERVAL, api_poll_interval))
+        self._max_interval = float(max(api_poll_interval_max or api_poll_interval, api_poll_interval))
+        self._last_sample: dict[str, float] = {}
+        # Time between the start of the last poll and the next one (s), as
+        # scheduled: hub slot, upload alignment or circuit backoff included
+        self._scheduled_interval = float(api_poll_interval)
+        self._poll_started: float | None = None
+        # Upload period/delay of the device, learned from the sample dates;
+        # polls are placed just after the next expected upload
+        self.uploads = UploadTracker()
+        # Change dispatch: listeners registered with a context of payload keys
+        # are only called when one of those keys changed. None = notify all.
+        self._key_index: dict[str, list[CALLBACK_TYPE]] = {}
+        self._changed_keys: set[str] | None = None
+        self._dispatched_success: bool | None = None
+        # Latency, status, size, retry and decode statistics per endpoint
+        self.stats = RequestStats()
+        # kWh totals integrated from every telemetry sample
+        self.energy = EnergyIntegrator()
+        # Hourly mean/min/max of the power values in statistics-only mode
+        self.hourly = HourlyStatistics(statistics_keys) if statistics_keys else None
+        # Rolling windows of the recent samples (min/max/mean attributes)
+        self.rolling = RollingStats()
+        # Smoothed SOC rate for the time-to-maxSOC/minSOC estimates
+        self.runtime = RuntimeEstimator()
 
-        _LOGGER.debug("API Coordinator initialized: api_poll_interval=%s", api_poll_interval)
+        _LOGGER.debug(
+            "API Coordinator initialized: api_poll_interval=%s adaptive=%s max=%s",
+            api_poll_interval,
+            adaptive_polling,
+            self._max_interval,
+        )
 
         super().__init__(
             hass,
@@ -30,90 +152,623 @@ class APICoordinator(DataUpdateCoordinator):
             name="Maxxisun API Coordinator",
             update_interval=timedelta(seconds=api_poll_interval),
         )
+        if hub is not None:
+            hub.async_register(self)
 
     async def _async_update_data(self):
-        """Ruft periodisch Device-Daten und Config von der REST-API ab."""
+        """Ruft periodisch Device-Daten und (falls fällig) Config von der REST-API ab."""
         _LOGGER.debug("Requesting data from Maxxisun API")
-        headers = {
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
-            "Accept": "application/json, text/plain, */*",
-            "Authorization": f"Bearer {self._token}",
+        self._poll_started = self.hass.loop.time()
+        if self._hub is not None and self._next_poll_at is not None:
+            lateness = max(0.0, self.hass.loop.time() - self._next_poll_at)
+            self._hub.async_record_poll(lateness, self._interval)
+        started = time.perf_counter()
+        failed = True
+        # A hung connection must not stall the coordinator past its next poll.
+        # Requests and retries share this budget, time spent waiting for the
+        # hub's request budget does not count.
+        budget = min(HTTP_TOTAL_TIMEOUT, self._interval * POLL_TIMEOUT_FRACTION)
+        deadline = time.monotonic() + budget
+        self._set_request_timeout(budget)
+        try:
+            if self._config_due():
+                # Telemetry and config are independent, fetch both in one round-trip
+                data, _ = await asyncio.gather(
+                    self._async_fetch_device_retrying(deadline),
+                    self._async_authorized(self._async_fetch_config, endpoint="config"),
+                )
+            else:
+                data = await self._async_fetch_device_retrying(deadline)
+            arrival = time.time()
+            if self.uploads.add(data.get("date"), arrival) or self.data is None or self.restored:
+                snapshot = self._apply_telemetry(data)
+                if snapshot.date is not None:
+                    self.stats.record_sample(arrival - snapshot.date / 1000)
+            else:
+                # Same sample as the last poll: nothing to parse or dispatch
+                snapshot = self.data
+                self.stats.record_sample(None)
+            if self._failures >= CIRCUIT_FAILURE_THRESHOLD:
+                _LOGGER.info("API reachable again, resuming normal polling")
+            self._failures = 0
+            self._last_success_at = time.time()
+            if self.stale:
+                # Every entity drops its data_age attribute
+                self.stale = False
+                self._changed_keys = None
+            failed = False
+            return snapshot
+        except AuthFailed as err:
+            # Re-login itself was rejected, let HA start the reauth flow
+            self._failures += 1
+            raise ConfigEntryAuthFailed(f"Re-login failed: {err}") from err
+        except (aiohttp.ClientError, TimeoutError, UpdateFailed) as err:
+            self._failures += 1
+            if self._failures == CIRCUIT_FAILURE_THRESHOLD:
+                _LOGGER.warning("API failed %d polls in a row, backing off polling", self._failures)
+            if isinstance(err, TimeoutError):
+                message = f"API request timed out after {budget:.1f} s"
+            elif isinstance(err, UpdateFailed):
+                message = str(err)
+            else:
+                message = f"API request error: {err}"
+            return self._serve_stale(message, err)
+        finally:
+            self.stats.record_poll(time.perf_counter() - started, failed)
+            self._mark_changed("stats")
+            self._schedule_next_poll()
+
+    def _apply_telemetry(self, data: dict) -> TelemetrySnapshot:
+        """Parse a new sample and mark what changed for the listeners."""
+        if self._adaptive_polling:
+            self._adapt_interval(data)
+        # Parse once per poll; entities only read the snapshot's attributes
+        snapshot = TelemetrySnapshot.from_payload(data)
+        changed = snapshot.changed_keys(self.data)
+        if changed is None or self.restored:
+            # First live data replaces the restored state of every entity
+            self._changed_keys = None
+            self.restored = False
+        else:
+            self._mark_changed(*changed)
+        self._mark_changed(*self.energy.add(snapshot))
+        self._mark_changed(*self.rolling.add(snapshot))
+        self._mark_changed(*self.runtime.update(snapshot, self.rolling))
+        if self.hourly is not None and (finished := self.hourly.add(snapshot)):
+            async_import_hourly(self.hass, snapshot.device_id or self._device_id or "unknown", finished)
+        if self._store is not None:
+            self._schedule_save()
+        return snapshot
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Persist the snapshot at most once per STORAGE_SAVE_DELAY, with the data current at write time."""
+        now = self.hass.loop.time()
+        if self._save_at is not None and now < self._save_at:
+            # A save is pending, it writes this sample too
+            return
+        # STORAGE_SAVE_DELAY after the last save, right away after a quiet spell
+        delay = 0.0 if self._save_at is None else max(0.0, self._save_at + STORAGE_SAVE_DELAY - now)
+        self._save_at = now + delay
+        self._store.async_delay_save(self._data_to_store, delay)
+
+    async def async_save(self) -> None:
+        """Write the snapshot now (entry unload), replacing a pending delayed save."""
+        if self._store is not None and self.data is not None:
+            await self._store.async_save(self._data_to_store())
+
+    async def async_start(self, entry: ConfigEntry) -> None:
+        """First refresh, served from the persisted snapshot if there is one.
+
+        With a snapshot the entities are created from it right away and the
+        live refresh runs in the background; without one setup waits for the
+        cloud and raises ConfigEntryNotReady if it is unreachable.
+        """
+        if await self._async_restore():
+            entry.async_create_background_task(self.hass, self.async_refresh(), f"{self.name} initial refresh")
+        else:
+            await self.async_config_entry_first_refresh()
+
+    async def _async_restore(self) -> bool:
+        """Load the persisted telemetry and config, True if there was a snapshot."""
+        if self._store is None:
+            return False
+        stored = await self._store.async_load()
+        if not isinstance(stored, dict) or not isinstance(stored.get("telemetry"), dict):
+            return False
+        self.data = TelemetrySnapshot.from_payload(project_telemetry(stored["telemetry"]))
+        self._device_id = self.data.device_id
+        # Last sample before the restart, integrated up to the first live one
+        self.energy.add(self.data)
+        self.rolling.add(self.data)
+        # Served for display only, the live refresh fetches the config again
+        config = stored.get("config")
+        self.config = DeviceConfig.from_payload(config) if isinstance(config, dict) else None
+        self._last_success_at = stored.get("saved_at")
+        self.restored = True
+        _LOGGER.debug("Restored snapshot of device %s from %s", self._device_id, stored.get("saved_at"))
+        return True
+
+    @callback
+    def _data_to_store(self) -> dict:
+        """Snapshot persisted by the Store, including the array sizes via the payload."""
+        return {
+            "telemetry": self.data.raw if self.data else None,
+            "config": self.config.raw if self.config else None,
+            # Age of the data, not of the file: a flush on unload keeps it
+            "saved_at": self._last_success_at or time.time(),
         }
-        
+
+    async def _async_fetch_device_retrying(self, deadline: float):
+        """Fetch telemetry, retrying transient errors with jittered backoff until deadline."""
+        attempt = 0
+        # While the circuit is open a poll is a single probe
+        attempts = 1 if self.circuit_open else RETRY_ATTEMPTS
+        while True:
+            try:
+                return await self._async_authorized(self._async_fetch_device, endpoint="last")
+            except (aiohttp.ClientError, TimeoutError, TransientError) as err:
+                attempt += 1
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+                remaining = deadline - time.monotonic() - delay
+                # Give up unless a retry still has a useful share of the budget
+                if attempt >= attempts or remaining < HTTP_CONNECT_TIMEOUT / 5:
+                    raise
+                _LOGGER.debug("Telemetry request failed (%s), retry %d in %.1f s", err, attempt, delay)
+                self.stats.endpoint("last").retries += 1
+                await asyncio.sleep(delay)
+                self._set_request_timeout(remaining)
+
+    def _set_request_timeout(self, budget: float) -> None:
+        """Use budget (s) as total timeout of the poll's next requests."""
+        self._poll_timeout = aiohttp.ClientTimeout(
+            total=budget, connect=min(HTTP_CONNECT_TIMEOUT, budget), sock_read=min(HTTP_READ_TIMEOUT, budget)
+        )
+
+    def _serve_stale(self, message: str, err: Exception) -> TelemetrySnapshot:
+        """Keep serving the last good data within the grace window, else fail the poll."""
+        age = self.data_age
+        if self.data is None or age is None or age > self._stale_grace:
+            raise UpdateFailed(message) from err
+        if not self.stale:
+            _LOGGER.warning("%s, serving data from %.0f s ago", message, age)
+        self.stale = True
+        # Every entity updates its data_age attribute
+        self._changed_keys = None
+        return self.data
+
+    @property
+    def data_age(self) -> float | None:
+        """Seconds since the last successful poll, None before the first one."""
+        if self._last_success_at is None:
+            return None
+        return max(0.0, time.time() - self._last_success_at)
+
+    def freshness_attributes(self) -> dict:
+        """State attributes telling the entities' values are not live, empty while they are."""
+        attributes = {}
+        if self.restored:
+            # Value comes from the persisted snapshot, no live poll yet
+            attributes["restored"] = True
+        if self.stale:
+            # Polls are failing, this is the last good value (grace window)
+            attributes["data_age"] = round(self.data_age)
+        return attributes
+
+    @property
+    def circuit_open(self) -> bool:
+        """True while polling is backed off because the API keeps failing."""
+        return self._failures >= CIRCUIT_FAILURE_THRESHOLD
+
+    def _schedule_next_poll(self) -> None:
+        """Set update_interval so the next poll lands on this coordinator's phase slot."""
+        interval = self._interval
+        if self.circuit_open:
+            # Double the interval per further failure, the next poll probes the API
+            interval = min(CIRCUIT_MAX_INTERVAL, interval * 2 ** (self._failures - CIRCUIT_FAILURE_THRESHOLD + 1))
+        now = self.hass.loop.time()
+        delay = interval
+        upload = None if self.circuit_open else self._upload_delay(interval)
+        if upload is not None:
+            delay = upload
+        elif self._hub is not None:
+            # Next slot phase + k * interval that is at least half an interval away
+            phase = self._hub.poll_phase(self, interval)
+            slot = math.ceil((now + interval / 2 - phase) / interval)
+            delay = phase + slot * interval - now
+        self._next_poll_at = now + delay
+        self.update_interval = timedelta(seconds=delay)
+        scheduled = round(self._next_poll_at - (self._poll_started or now))
+        if scheduled != self._scheduled_interval:
+            self._scheduled_interval = scheduled
+            self._mark_changed("poll_interval")
+
+    def _upload_delay(self, interval: float) -> float | None:
+        """Seconds until just after the first upload readable interval from now, None while unknown.
+
+        Never shorter than interval: uploads faster than the polls are
+        skipped, slower ones stretch the delay to just after the next one
+        (less than interval + period). A poll that was too early waits for
+        the next aligned poll like any other.
+        """
+        uploads = self.uploads
+        wall = time.time()
+        poll_at = uploads.next_upload(wall + interval)
+        if poll_at is None:
+            return None
+        return max(interval, poll_at - wall)
+
+    def _rate_limited(self, resp) -> None:
+        """Pause all requests of the hub after HTTP 429."""
+        if self._hub is not None:
+            self._hub.async_backoff(resp.headers.get("Retry-After"))
+
+    def _auth_headers(self, token: str) -> dict:
+        """Authorization header for token, built once per token (the session adds the rest)."""
+        if token != self._headers_token:
+            self._headers_token, self._headers = token, {"Authorization": f"Bearer {token}"}
+        return self._headers
+
+    async def _async_authorized(self, request, endpoint: str | None = None):
+        """Run request(headers) with a valid token, re-login once on HTTP 401."""
+        token = await self._token_manager.async_get_token()
         try:
-            # Fetch device telemetry
-            url_device = f"{API_BASE_URL}/api/device/last"
-            async with self._session.get(url_device, headers=headers, ssl=self._ssl) as resp:
+            async with self._request_slot():
+                return await request(self._auth_headers(token))
+        except Unauthorized:
+            _LOGGER.debug("Token rejected, logging in again")
+            if endpoint:
+                self.stats.endpoint(endpoint).retries += 1
+            token = await self._token_manager.async_refresh(token)
+            try:
+                async with self._request_slot():
+                    return await request(self._auth_headers(token))
+            except Unauthorized as err:
+                raise AuthFailed("Token rejected after re-login") from err
+
+    def _request_slot(self):
+        """Return the hub's request gate, a no-op without hub."""
+        if self._hub is not None:
+            return self._hub.request_slot()
+        return contextlib.nullcontext()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context=None) -> CALLBACK_TYPE:
+        """Listen for updates, indexed by the payload keys given as context."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        if not context:
+            return remove_listener
+
+        for key in context:
+            self._key_index.setdefault(key, []).append(update_callback)
+
+        @callback
+        def remove_keyed_listener() -> None:
+            remove_listener()
+            for key in context:
+                listeners = self._key_index.get(key)
+                if listeners and update_callback in listeners:
+                    listeners.remove(update_callback)
+                    if not listeners:
+                        del self._key_index[key]
+
+        return remove_keyed_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify unkeyed listeners and only the keyed ones whose keys changed."""
+        started = time.perf_counter()
+        try:
+            self._async_dispatch()
+        finally:
+            self.stats.record_dispatch(time.perf_counter() - started)
+
+    @callback
+    def _async_dispatch(self) -> None:
+        changed, self._changed_keys = self._changed_keys, set()
+        if changed is None or self._dispatched_success != self.last_update_success:
+            # First data or availability flip: every entity has to write state
+            self._dispatched_success = self.last_update_success
+            super().async_update_listeners()
+            return
+
+        for update_callback, context in list(self._listeners.values()):
+            if not context:
+                update_callback()
+        notified: set[CALLBACK_TYPE] = set()
+        for key in changed:
+            for update_callback in self._key_index.get(key, ()):
+                if update_callback not in notified:
+                    notified.add(update_callback)
+                    update_callback()
+
+    def _mark_changed(self, *keys: str) -> None:
+        """Record keys to dispatch with the next listener update."""
+        if self._changed_keys is not None:
+            self._changed_keys.update(keys)
+
+    @property
+    def effective_interval(self) -> float:
+        """Return the time (s) from the start of the last poll to the next one, as scheduled."""
+        return self._scheduled_interval
+
+    def _adapt_interval(self, data) -> None:
+        """Shorten the poll interval on fast changes, stretch it while idle."""
+        sample: dict[str, float] = {}
+        for key in ADAPTIVE_ACTIVE_DELTA:
+            try:
+                sample[key] = float(data.get(key, 0) or 0)
+            except (ValueError, TypeError):
+                sample[key] = 0.0
+        previous, self._last_sample = self._last_sample, sample
+        if not previous:
+            return
+
+        deltas = {key: abs(sample[key] - previous[key]) for key in sample}
+        current = self._interval
+        if any(deltas[key] >= limit for key, limit in ADAPTIVE_ACTIVE_DELTA.items()):
+            interval = max(self._min_interval, current / 2)
+        elif sample["PV_power_total"] == 0 and all(
+            deltas[key] <= limit for key, limit in ADAPTIVE_IDLE_DELTA.items()
+        ):
+            interval = min(self._max_interval, current * ADAPTIVE_GROWTH_FACTOR)
+        elif current < self._base_interval:
+            # Moderate activity: relax back towards the configured interval
+            interval = min(self._base_interval, current * ADAPTIVE_GROWTH_FACTOR)
+        else:
+            interval = max(self._base_interval, current / ADAPTIVE_GROWTH_FACTOR)
+
+        interval = round(interval, 1)
+        if interval != current:
+            _LOGGER.debug("Adaptive polling: interval %s s -> %s s (deltas %s)", current, interval, deltas)
+            self._interval = interval
+            if self.uploads.period is not None and interval < self.uploads.period <= current:
+                # Polls slower than the uploads could not see them get faster
+                self.uploads.relearn()
+
+    def _config_due(self) -> bool:
+        """Return True if the config has to be refreshed in this cycle."""
+        if self._config_stale or self._config_fetched_at is None:
+            return True
+        return time.monotonic() - self._config_fetched_at >= CONFIG_POLL_INTERVAL
+
+    async def _async_fetch_device(self, headers: dict):
+        """Fetch device telemetry."""
+        url_device = f"{API_BASE_URL}/api/device/last"
+        stats = self.stats.endpoint("last")
+        started = time.perf_counter()
+        try:
+            async with self._session.get(url_device, headers=headers, timeout=self._poll_timeout) as resp:
+                body = await resp.read()
+                stats.record(time.perf_counter() - started, resp.status, len(body))
+                if resp.status == 401:
+                    raise Unauthorized
+                if resp.status == 429:
+                    self._rate_limited(resp)
+                if resp.status >= 500:
+                    raise TransientError(f"HTTP {resp.status}")
                 if resp.status not in (200, 202):
                     raise UpdateFailed(f"HTTP {resp.status}")
-                data = await resp.json()
-                self._device_id = data.get("deviceId", self._device_id)
-            
-            # Fetch device config (for number entities)
-            url_config = f"{API_BASE_URL}/api/device/config"
-            async with self._session.get(url_config, headers=headers, ssl=self._ssl) as resp:
-                if resp.status not in (200, 202):
+        except (aiohttp.ClientError, TimeoutError) as err:
+            stats.record(time.perf_counter() - started, type(err).__name__)
+            raise
+        decode_started = time.perf_counter()
+        try:
+            # orjson on the raw bytes, then only the keys the entities read
+            data = project_telemetry(json_loads_object(body))
+        except ValueError as err:
+            raise UpdateFailed(f"Invalid telemetry response: {err}") from err
+        finally:
+            stats.decode_time += time.perf_counter() - decode_started
+        self._device_id = data.get("deviceId", self._device_id)
+        return data
+
+    async def _async_fetch_config(self, headers: dict):
+        """Fetch device config (for number entities), skipping unchanged responses.
+
+        A failing config fetch must not fail the telemetry poll, so errors are
+        only logged and the config is retried in the next cycle.
+        """
+        url_config = f"{API_BASE_URL}/api/device/config"
+        headers = dict(headers)
+        if self.config is not None:
+            if self._config_etag:
+                headers["If-None-Match"] = self._config_etag
+            if self._config_last_modified:
+                headers["If-Modified-Since"] = self._config_last_modified
+        stats = self.stats.endpoint("config")
+        started = time.perf_counter()
+        try:
+            async with self._session.get(url_config, headers=headers, timeout=self._poll_timeout) as resp:
+                body = await resp.read()
+                stats.record(time.perf_counter() - started, resp.status, len(body))
+                if resp.status == 401:
+                    raise Unauthorized
+                if resp.status == 429:
+                    self._rate_limited(resp)
+                if resp.status == 304:
+                    _LOGGER.debug("Config not modified")
+                elif resp.status not in (200, 202):
                     _LOGGER.warning("Config fetch failed with status %s", resp.status)
+                    return
                 else:
-                    self.config = await self._normalize_config_response(resp)
-            
-            return data
+                    self._config_etag = resp.headers.get("ETag")
+                    self._config_last_modified = resp.headers.get("Last-Modified")
+                    body_hash = hashlib.sha1(body).hexdigest()
+                    if body_hash != self._config_hash or self.config is None:
+                        decode_started = time.perf_counter()
+                        config = self._normalize_config_response(body)
+                        stats.decode_time += time.perf_counter() - decode_started
+                        if config is None:
+                            _LOGGER.warning("Config fetch returned no valid config")
+                            return
+                        self._set_config(config)
+                        self._config_hash = body_hash
+                    else:
+                        _LOGGER.debug("Config unchanged")
         except (aiohttp.ClientError, TimeoutError) as err:
-            raise UpdateFailed(f"API request error: {err}") from err
+            stats.record(time.perf_counter() - started, type(err).__name__)
+            _LOGGER.warning("Config fetch failed: %s", err)
+            return
+        self._config_fetched_at = time.monotonic()
+        self._config_stale = False
+
+    def _set_config(self, raw: dict) -> DeviceConfig:
+        """Take a config payload as the next version, mark the changed fields."""
+        previous = self.config
+        config = DeviceConfig.from_payload(raw, previous.version + 1 if previous else 1)
+        changed = config.changed_fields(previous)
+        _LOGGER.debug("Config version %s, changed fields %s", config.version, changed)
+        self.config = config
+        self._mark_changed(*map(config_key, changed))
+        return config
+
+    def config_value(self, field: str):
+        """Typed config value, including writes that are queued or in flight."""
+        if field in self._optimistic:
+            return self._optimistic[field]
+        if self.config is None:
+            return None
+        return self.config.values.get(field)
+
+    async def async_apply_config(self, fields: dict) -> dict:
+        """Write only the fields that differ from the current config.
+
+        fields must be validated (models.validate_config_fields). Returns the
+        changed fields, nothing is sent when that is empty; otherwise all of
+        them go out in one PUT.
+        """
+        await self._ensure_config()
+        changed = {field: value for field, value in fields.items() if self.config_value(field) != value}
+        if not changed:
+            _LOGGER.debug("Config already matches %s, nothing to write", fields)
+            return changed
+        await self.async_set_config_fields(changed)
+        return changed
 
     async def async_set_config_field(self, field: str, value):
         """Aktualisiert einzelnes Config-Feld via PUT."""
-        headers = {
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
-            "Accept": "application/json, text/plain, */*",
-            "Authorization": f"Bearer {self._token}",
-            "Content-Type": "application/json",
-        }
+        return await self.async_set_config_fields({field: value})
+
+    async def async_set_config_fields(self, fields: dict):
+        """Queue config fields and wait for the merged PUT that carries them."""
+        _LOGGER.debug("Queueing device config fields %s", fields)
+        self._pending_writes.update(fields)
+        self._optimistic.update(fields)
+        self._mark_changed(*map(config_key, fields))
+        self.async_update_listeners()
+
+        if self._write_future is None:
+            self._write_future = self.hass.loop.create_future()
+            self.hass.async_create_task(self._async_flush_writes(self._write_future))
+        # Shield the shared batch from a cancelled caller
+        return await asyncio.shield(self._write_future)
+
+    async def _async_flush_writes(self, future: asyncio.Future):
+        """Send one PUT for the current batch once the debounce window closed."""
+        await asyncio.sleep(CONFIG_WRITE_DEBOUNCE)
+        async with self._write_lock:
+            # Everything queued until now goes into this PUT; later calls
+            # start a new batch that waits for the lock.
+            fields, self._pending_writes = self._pending_writes, {}
+            if self._write_future is future:
+                self._write_future = None
+            try:
+                config = await self._async_put_config(fields)
+            except Exception as err:  # noqa: BLE001 - handed to the waiting callers
+                _LOGGER.warning("Config update of %s failed, rolling back: %s", list(fields), err)
+                self._settle_optimistic(fields)
+                future.set_exception(err)
+                return
+            self._settle_optimistic(fields)
+            future.set_result(config)
+
+    def _settle_optimistic(self, fields: dict) -> None:
+        """Drop optimistic values of a finished write unless queued again."""
+        for field in fields:
+            if field not in self._pending_writes:
+                self._optimistic.pop(field, None)
+        self._mark_changed(*map(config_key, fields))
+        self.async_update_listeners()
+
+    async def _async_put_config(self, fields: dict):
+        """PUT the merged config and take the response as the new config."""
         url = f"{API_BASE_URL}/api/device/config"
         # Ensure we have the latest config
-        await self._ensure_config(headers)
+        await self._ensure_config()
 
-        # Build payload with all known control fields and the updated value
+        # Build payload with all known control fields and the updated values
         control_keys = set(CONTROL_NUMBER_MAP.keys()) | set(CONTROL_SELECT_MAP.keys()) | set(CONTROL_DIAGNOSTIC_MAP.keys())
-        current = self.config or {}
-        if isinstance(current, dict) and "data" in current and isinstance(current.get("data"), dict):
-            current = current["data"]
+        current = self.config.raw
 
         merged = {k: v for k, v in current.items() if k in control_keys}
-        # merged["meterIp"] = current["meterIp"]
-        merged[field] = value
+        merged.update(fields)
 
-        device_id = current.get("deviceId") if isinstance(current, dict) else None
+        device_id = self.config.device_id
         if not device_id:
             device_id = self._device_id
         if device_id:
             merged["deviceId"] = device_id
 
-        _LOGGER.debug("Updating device config field %s=%s with merged payload", field, value)
+        _LOGGER.debug("Updating device config with merged payload %s", merged)
+
+        stats = self.stats.endpoint("config_put")
+
+        async def put(headers: dict):
+            started = time.perf_counter()
+            try:
+                async with self._session.put(url, headers=headers, json=merged) as resp:
+                    body = await resp.read()
+                    stats.record(time.perf_counter() - started, resp.status, len(body))
+                    if resp.status == 401:
+                        raise Unauthorized
+                    if resp.status == 429:
+                        self._rate_limited(resp)
+                    if resp.status not in (200, 202):
+                        raise UpdateFailed(f"HTTP {resp.status}")
+                    decode_started = time.perf_counter()
+                    config = self._normalize_config_response(body, fallback_device_id=device_id)
+                    stats.decode_time += time.perf_counter() - decode_started
+                    return config
+            except (aiohttp.ClientError, TimeoutError) as err:
+                stats.record(time.perf_counter() - started, type(err).__name__)
+                raise
+
         try:
-            _LOGGER.warning("Logoutput Put-Config: %s",merged)
-            return merged
-            # async with self._session.put(url, headers=headers, json=merged, ssl=self._ssl) as resp:
-            #     if resp.status not in (200, 202):
-            #         raise UpdateFailed(f"HTTP {resp.status}")
-            #     self.config = await self._normalize_config_response(resp, fallback_device_id=device_id)
-            #     return self.config
+            config = await self._async_authorized(put, endpoint="config_put")
         except (aiohttp.ClientError, TimeoutError) as err:
             raise UpdateFailed(f"Config update error: {err}") from err
 
-    async def _ensure_config(self, headers: dict):
+        # Conditional GET validators belong to the previous config
+        self._config_etag = self._config_last_modified = self._config_hash = None
+        if config is None:
+            # No config in the response: take what was sent, so the UI keeps the
+            # new values and the next batch merges over them; the next poll
+            # still picks up the device's view
+            config = self._set_config({**current, **merged})
+            self._config_stale = True
+            return config
+        # The response is the next version, no GET needed to pick it up
+        config = self._set_config(config)
+        self._config_fetched_at = time.monotonic()
+        return config
+
+    async def _ensure_config(self):
         """Fetch config if not yet loaded."""
         if self.config is not None:
             return
-        url_config = f"{API_BASE_URL}/api/device/config"
-        async with self._session.get(url_config, headers=headers, ssl=self._ssl) as resp:
-            if resp.status not in (200, 202):
-                raise UpdateFailed(f"HTTP {resp.status}")
-            self.config = await self._normalize_config_response(resp)
+        await self._async_authorized(self._async_fetch_config, endpoint="config")
+        if self.config is None:
+            raise UpdateFailed("Config not available")
 
-    async def _normalize_config_response(self, resp, fallback_device_id=None):
+    def _normalize_config_response(self, body: bytes, fallback_device_id=None):
         """Normalize config response into a flat dict with deviceId if available."""
-        raw = await resp.json()
+        # Not projected: unknown fields stay in DeviceConfig.raw for the snapshot
+        # and diagnostics
+        try:
+            raw = json_loads(body)
+        except ValueError:
+            return None
         cfg = raw.get("data") if isinstance(raw, dict) and "data" in raw else raw
         if isinstance(cfg, dict):
             if self._device_id and not cfg.get("deviceId"):
@@ -0,0 +1,44 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+# email + CCU are the login credentials, the JWT grants access to the device,
+# the power meter's address (both spellings the API uses) is in the user's LAN
+TO_REDACT = {"token", "jwt", "email", "ccu", "deviceId", "meterIp", "meterIP"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return request statistics and the last payloads for a config entry."""
+    data = hass.data[DOMAIN].get(entry.entry_id, {})
+    coordinator = data.get("coordinator")
+    hub = data.get("hub")
+
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            # Presets hold config fields
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "hub": hub.stats() if hub is not None else None,
+    }
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "last_update_success": coordinator.last_update_success,
+            "restored": coordinator.restored,
+            "stale": coordinator.stale,
+            "data_age": coordinator.data_age,
+            "circuit_open": coordinator.circuit_open,
+            "poll_interval": coordinator.effective_interval,
+            "upload_period": coordinator.uploads.period,
+            "upload_lag": coordinator.uploads.lag,
+            "config_version": coordinator.config.version if coordinator.config else None,
+            "stats": coordinator.stats.as_dict(),
+            "energy_kwh": coordinator.energy.totals,
+            "soc_rate": coordinator.runtime.rate,
+            "rolling": {key: coordinator.rolling.attributes(key) for key in coordinator.rolling.buffers},
+            "telemetry": async_redact_data(coordinator.data.raw, TO_REDACT) if coordinator.data else None,
+            "config": async_redact_data(coordinator.config.raw, TO_REDACT) if coordinator.config else None,
+        }
+    return diagnostics
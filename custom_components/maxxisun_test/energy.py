@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from .const import DERIVED_SENSOR_MAP, ENERGY_MAX_GAP, ENERGY_SENSOR_MAP
+from .models import TelemetrySnapshot
+
+# (key, source, direction) in ENERGY_SENSOR_MAP order, and every power
+# source once with whether it is a derived value
+_TOTALS = tuple((key, source, direction) for key, (_tk, source, direction, _icon) in ENERGY_SENSOR_MAP.items())
+_SOURCES = tuple((source, source in DERIVED_SENSOR_MAP) for source in dict.fromkeys(s for _k, s, _d in _TOTALS))
+
+
+def _power(value) -> float | None:
+    """Power in W, None if the sample has no valid value."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class EnergyIntegrator:
+    """Integrates the power samples of every poll into energy totals (kWh).
+
+    Trapezoidal rule over the device's own sample time (payload "date", ms),
+    split by sign per ENERGY_SENSOR_MAP. Repeated samples (same date), clock
+    jumps backwards and gaps over ENERGY_MAX_GAP add nothing. Totals start
+    at 0 and are raised by restore() with the entities' last states.
+    """
+
+    __slots__ = ("totals", "_date", "_powers", "_restored")
+
+    def __init__(self):
+        self.totals: dict[str, float] = dict.fromkeys(ENERGY_SENSOR_MAP, 0.0)
+        self._date: int | None = None
+        self._powers: dict[str, float | None] = {}
+        self._restored: set[str] = set()
+
+    def add(self, snapshot: TelemetrySnapshot) -> list[str]:
+        """Integrate the interval up to this sample, return the keys that grew."""
+        date = snapshot.date
+        if date is None or date == self._date:
+            return []
+        derived_values, raw = snapshot.derived, snapshot.raw
+        powers = {
+            source: derived_values.get(source) if derived else _power(raw.get(source)) for source, derived in _SOURCES
+        }
+        previous, previous_date = self._powers, self._date
+        self._date, self._powers = date, powers
+        if previous_date is None:
+            return []
+        hours = (date - previous_date) / 3_600_000
+        if hours <= 0 or hours * 3600 > ENERGY_MAX_GAP:
+            return []
+        grown = []
+        for key, source, direction in _TOTALS:
+            before, now = previous.get(source), powers[source]
+            if before is None or now is None:
+                continue
+            # Only the part flowing in this key's direction, W -> kW
+            energy = (max(0.0, direction * before) + max(0.0, direction * now)) / 2000 * hours
+            if energy:
+                self.totals[key] += energy
+                grown.append(key)
+        return grown
+
+    def restore(self, key: str, value: float) -> None:
+        """Continue a total from its last recorded state, once per key."""
+        if key in self._restored or key not in self.totals:
+            return
+        self._restored.add(key)
+        self.totals[key] += value
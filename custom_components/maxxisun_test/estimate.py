@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from math import exp
+from statistics import StatisticsError, linear_regression
+
+from .const import ESTIMATE_MIN_RATE, ESTIMATE_SMOOTHING, ESTIMATE_WINDOW
+from .models import TelemetrySnapshot
+from .rolling import RollingStats
+
+
+def soc_trend(rolling: RollingStats) -> float | None:
+    """Least-squares slope of SOC over ESTIMATE_WINDOW in %/h, None while SOC is flat."""
+    times, values = rolling.buffers["SOC"].samples(ESTIMATE_WINDOW)
+    if len(values) < 3 or min(values) == max(values):
+        return None
+    start = times[0]
+    try:
+        return linear_regression([(t - start) / 3_600_000 for t in times], values).slope
+    except StatisticsError:
+        return None
+
+
+def power_trend(snapshot: TelemetrySnapshot, rolling: RollingStats) -> float | None:
+    """Mean PowerBattery over ESTIMATE_WINDOW as %/h of the total capacity."""
+    capacity = snapshot.number("BatteryCapacity")
+    power = rolling.value("PowerBattery", ESTIMATE_WINDOW, "mean")
+    if not capacity or power is None:
+        return None
+    return power / capacity * 100
+
+
+class RuntimeEstimator:
+    """Smoothed SOC rate (%/h) for the time-to-maxSOC/minSOC sensors.
+
+    Updated once per new sample from the rolling windows: the SOC trend, or
+    the battery power while SOC sits on one value (coarse SOC steps, slow
+    charging). Exponential smoothing over the device's sample time keeps
+    the estimate from jumping with every poll.
+    """
+
+    __slots__ = ("rate", "_date")
+
+    def __init__(self):
+        self.rate: float | None = None
+        self._date: int | None = None
+
+    def update(self, snapshot: TelemetrySnapshot, rolling: RollingStats) -> list[str]:
+        """Take the rate of a new sample, return ["soc_rate"] if it moved."""
+        date = snapshot.date
+        if date is None or (self._date is not None and date <= self._date):
+            return []
+        rate = soc_trend(rolling)
+        if rate is None:
+            rate = power_trend(snapshot, rolling)
+        if rate is None:
+            return []
+        if self.rate is None or self._date is None:
+            self.rate = rate
+        else:
+            alpha = 1 - exp(-(date - self._date) / 1000 / ESTIMATE_SMOOTHING)
+            self.rate += alpha * (rate - self.rate)
+        self._date = date
+        return ["soc_rate"]
+
+    def minutes_to(self, soc: float | None, target: float | None, direction: int) -> int | None:
+        """Minutes until SOC reaches target going in direction (1 up, -1 down).
+
+        0 once it is reached, None without a rate or while the battery is
+        idle or moving the other way.
+        """
+        if self.rate is None or soc is None or target is None:
+            return None
+        remaining = (target - soc) * direction
+        if remaining <= 0:
+            return 0
+        rate = self.rate * direction
+        if rate < ESTIMATE_MIN_RATE:
+            return None
+        return round(remaining / rate * 60)
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from homeassistant.config_entries import ConfigEntry
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .auth import TokenManager
+from .client import create_session
+from .const import (
+    HUB_DEADLINE_TOLERANCE,
+    HUB_MAX_CONCURRENT_REQUESTS,
+    HUB_REQUEST_BURST,
+    HUB_REQUESTS_PER_MINUTE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the delay in seconds of a Retry-After header (seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class MaxxisunHub:
+    """Domain-wide owner of all coordinators.
+
+    Staggers their poll phases evenly across the interval, shares one token
+    manager per account and gates every request through a common concurrency
+    limit and requests-per-minute budget that also honours 429/Retry-After.
+    Owns the HTTP sessions (one per SSL mode) and closes them with
+    async_close() or when Home Assistant shuts down.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._sessions: dict[bool, aiohttp.ClientSession] = {}
+        self._unsub_close = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_event)
+        self._coordinators: list = []
+        self._token_managers: dict[tuple, TokenManager] = {}
+        self._semaphore = asyncio.Semaphore(HUB_MAX_CONCURRENT_REQUESTS)
+        self._rate = HUB_REQUESTS_PER_MINUTE / 60
+        self._tokens = float(HUB_REQUEST_BURST)
+        self._tokens_at = hass.loop.time()
+        self._blocked_until = 0.0
+        self.polls = 0
+        self.missed_deadlines = 0
+        self.max_lateness = 0.0
+        self.throttled = 0
+
+    @callback
+    def async_get_token_manager(self, entry: ConfigEntry) -> TokenManager:
+        """Return the token manager shared by all entries of the entry's account."""
+        account = (entry.data.get("email"), entry.data.get("ccu"))
+        token_manager = self._token_managers.get(account)
+        if token_manager is None:
+            token_manager = TokenManager(
+                self._hass,
+                self.async_get_session(bool(entry.data.get("ignoreSSL"))),
+                entry.data.get("email"),
+                entry.data.get("ccu"),
+                entry.data.get("token"),
+                request_slot=self.request_slot,
+            )
+            self._token_managers[account] = token_manager
+        else:
+            token_manager.update_token(entry.data.get("token"))
+        return token_manager
+
+    @callback
+    def async_get_session(self, ignore_ssl: bool) -> aiohttp.ClientSession:
+        """Return the shared session for the API, with or without certificate checks."""
+        session = self._sessions.get(ignore_ssl)
+        if session is None or session.closed:
+            session = self._sessions[ignore_ssl] = create_session(ignore_ssl)
+        return session
+
+    async def async_close(self) -> None:
+        """Close the HTTP sessions once the last entry was unloaded."""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        await self._async_close_sessions()
+
+    async def _async_close_event(self, _event: Event) -> None:
+        self._unsub_close = None
+        await self._async_close_sessions()
+
+    async def _async_close_sessions(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
+
+    @callback
+    def async_register(self, coordinator) -> None:
+        self._coordinators.append(coordinator)
+
+    @callback
+    def async_unregister(self, coordinator) -> None:
+        if coordinator in self._coordinators:
+            self._coordinators.remove(coordinator)
+
+    @property
+    def idle(self) -> bool:
+        """True when no coordinator is registered any more."""
+        return not self._coordinators
+
+    def poll_phase(self, coordinator, interval: float) -> float:
+        """Return the coordinator's offset (s) within the poll interval."""
+        try:
+            index = self._coordinators.index(coordinator)
+        except ValueError:
+            return 0.0
+        return interval * index / len(self._coordinators)
+
+    @callback
+    def async_record_poll(self, lateness: float, interval: float) -> None:
+        """Track how late a poll started compared to its scheduled slot."""
+        self.polls += 1
+        self.max_lateness = max(self.max_lateness, lateness)
+        if lateness > interval * HUB_DEADLINE_TOLERANCE:
+            self.missed_deadlines += 1
+
+    @callback
+    def async_backoff(self, retry_after: str | None, default: float = 60.0) -> None:
+        """Block all requests after a 429 for Retry-After (or default) seconds."""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = default
+        self.throttled += 1
+        self._blocked_until = max(self._blocked_until, self._hass.loop.time() + delay)
+        _LOGGER.warning("API rate limit hit, pausing requests for %.0f s", delay)
+
+    async def _async_wait_budget(self) -> None:
+        """Wait for a Retry-After block to end and a token of the rate budget."""
+        loop = self._hass.loop
+        while True:
+            now = loop.time()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._tokens = min(float(HUB_REQUEST_BURST), self._tokens + (now - self._tokens_at) * self._rate)
+            self._tokens_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    @asynccontextmanager
+    async def request_slot(self):
+        """Gate one HTTP request through the shared budget and concurrency limit."""
+        await self._async_wait_budget()
+        async with self._semaphore:
+            yield
+
+    def stats(self) -> dict:
+        return {
+            "coordinators": len(self._coordinators),
+            "accounts": len(self._token_managers),
+            "polls": self.polls,
+            "missed_deadlines": self.missed_deadlines,
+            "max_lateness": round(self.max_lateness, 3),
+            "throttled": self.throttled,
+        }
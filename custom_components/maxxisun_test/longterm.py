@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from homeassistant.const import UnitOfPower
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from .const import DOMAIN, ENERGY_MAX_GAP
+from .models import TelemetrySnapshot
+
+HOUR_MS = 3_600_000
+
+
+class HourlyStatistics:
+    """Hourly mean/min/max of power values, aggregated in memory.
+
+    Each sample's value holds until the next sample (like the recorder's
+    time-weighted mean) and the intervals are split at hour boundaries on the
+    device's own clock (payload "date", ms). add() returns the hours that are
+    complete, ready for async_add_external_statistics. Samples after a gap
+    over ENERGY_MAX_GAP start a new interval, the hour in progress is lost
+    on a restart.
+    """
+
+    __slots__ = ("keys", "_hour", "_acc", "_date", "_values")
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        # Hour in progress (start, ms) and per key [integral, duration, min, max]
+        self._hour: int | None = None
+        self._acc: dict[str, list[float]] = {}
+        self._date: int | None = None
+        self._values: dict[str, float | None] = {}
+
+    def add(self, snapshot: TelemetrySnapshot) -> dict[str, list[dict]]:
+        """Take one sample, return finished hours per key."""
+        date = snapshot.date
+        if date is None or (self._date is not None and date <= self._date):
+            return {}
+        finished: dict[str, list[dict]] = {}
+        if self._date is not None and date - self._date <= ENERGY_MAX_GAP * 1000:
+            start = self._date
+            while start < date:
+                hour = start - start % HOUR_MS
+                end = min(date, hour + HOUR_MS)
+                if hour != self._hour:
+                    self._flush(finished)
+                    self._hour = hour
+                self._accumulate(end - start)
+                if end == hour + HOUR_MS:
+                    self._flush(finished)
+                start = end
+        elif self._hour is not None and date - date % HOUR_MS != self._hour:
+            # Gap into a later hour: what was collected is all there is
+            self._flush(finished)
+        self._date = date
+        self._values = {key: snapshot.number(key) for key in self.keys}
+        return finished
+
+    def _accumulate(self, duration: int) -> None:
+        for key, value in self._values.items():
+            if value is None:
+                continue
+            acc = self._acc.get(key)
+            if acc is None:
+                self._acc[key] = [value * duration, duration, value, value]
+            else:
+                acc[0] += value * duration
+                acc[1] += duration
+                if value < acc[2]:
+                    acc[2] = value
+                if value > acc[3]:
+                    acc[3] = value
+
+    def _flush(self, finished: dict[str, list[dict]]) -> None:
+        if self._hour is not None:
+            start = datetime.fromtimestamp(self._hour / 1000, tz=timezone.utc)
+            for key, (integral, duration, low, high) in self._acc.items():
+                if duration:
+                    finished.setdefault(key, []).append(
+                        {"start": start, "mean": integral / duration, "min": low, "max": high}
+                    )
+        self._hour = None
+        self._acc = {}
+
+
+def statistic_id(device_id: str, key: str) -> str:
+    """External statistic id of a power value, e.g. maxxisun_test:abc123_pccu."""
+    return f"{DOMAIN}:{slugify(f'{device_id}_{key}')}"
+
+
+def async_import_hourly(hass: HomeAssistant, device_id: str, finished: dict[str, list[dict]]) -> bool:
+    """Write finished hours as external statistics, False without recorder."""
+    if "recorder" not in hass.config.components:
+        return False
+    # The recorder is optional, only import it when it is running
+    from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+    for key, rows in finished.items():
+        metadata = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": f"Test_{device_id} {key}",
+            "source": DOMAIN,
+            "statistic_id": statistic_id(device_id, key),
+            "unit_of_measurement": UnitOfPower.WATT,
+        }
+        async_add_external_statistics(hass, metadata, rows)
+    return True
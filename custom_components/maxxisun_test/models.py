@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .const import (
+    CONFIG_FIELD_ALIASES,
+    CONTROL_DIAGNOSTIC_MAP,
+    CONTROL_NUMBER_MAP,
+    CONTROL_SELECT_MAP,
+    DERIVED_SENSOR_MAP,
+    SENSOR_MAP,
+)
+
+ARRAY_KEYS = ("convertersInfo", "batteriesInfo")
+# Top-level keys read from /api/device/last, the decoder drops everything else
+TELEMETRY_KEYS = (*SENSOR_MAP, "deviceId", "date")
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+_SCALAR_TYPE_SET = frozenset(_SCALAR_TYPES)
+# Flat keys holding the field names per index, they only change when an entry
+# was added, removed or gained/lost a field
+ARRAY_LAYOUT_KEYS = tuple(f"{key}.layout" for key in ARRAY_KEYS)
+_MISSING = object()
+# Plausible sample dates (ms, 2000-01-01 to 2100-01-01 UTC): beyond them
+# datetime.fromtimestamp and the rolling buffers' int64 arrays overflow
+_DATE_RANGE = (946_684_800_000, 4_102_444_800_000)
+
+
+def _to_float(value) -> float | None:
+    """Coerce an API value to float, None if not numeric."""
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return None
+
+
+def project_telemetry(data: dict[str, Any]) -> dict[str, Any]:
+    """Project a decoded telemetry payload onto the keys the entities consume.
+
+    Types are validated once here: non-scalar values of TELEMETRY_KEYS and a
+    non-numeric or implausible date (_DATE_RANGE) are dropped, a float date
+    is truncated to int ms, arrays
+    keep their positions but only the scalar fields of object entries, so
+    from_payload can skip type checks.
+    """
+    projected: dict[str, Any] = {}
+    for key in TELEMETRY_KEYS:
+        value = data.get(key, _MISSING)
+        if value is not _MISSING and isinstance(value, _SCALAR_TYPES):
+            projected[key] = value
+    date = projected.get("date")
+    if date is not None and (
+        isinstance(date, bool)
+        or not isinstance(date, (int, float))
+        or not math.isfinite(date)
+        or not _DATE_RANGE[0] <= date <= _DATE_RANGE[1]
+    ):
+        del projected["date"]
+    elif type(date) is float:
+        projected["date"] = int(date)
+    for key in ARRAY_KEYS:
+        items = data.get(key)
+        if isinstance(items, list):
+            projected[key] = _project_items(items)
+    return projected
+
+
+def _project_items(items: list) -> list[dict[str, Any]]:
+    """Array entries reduced to their scalar fields, clean entries are kept as is."""
+    projected = list(items)
+    for index, item in enumerate(projected):
+        if type(item) is not dict:
+            projected[index] = {}
+            continue
+        for value in item.values():
+            if type(value) not in _SCALAR_TYPE_SET:
+                projected[index] = {k: v for k, v in item.items() if type(v) in _SCALAR_TYPE_SET}
+                break
+    return projected
+
+
+def _to_int(value) -> int | None:
+    """Coerce an API value to int, None if not numeric."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(round(float(value)))
+    except (ValueError, TypeError):
+        return None
+
+
+def _to_str(value) -> str | None:
+    return None if value is None or isinstance(value, (dict, list)) else str(value)
+
+
+# Type of every config field an entity is bound to
+CONFIG_FIELD_TYPES = {
+    **{key: _to_int for key in CONTROL_NUMBER_MAP},
+    **{key: _to_int for key in CONTROL_SELECT_MAP},
+    **{key: _to_str for key in CONTROL_DIAGNOSTIC_MAP},
+}
+
+
+def number_bounds(field: str) -> tuple[int, int]:
+    """Range of a CONTROL_NUMBER_MAP field, percentages are capped at 100."""
+    return (0, 100) if CONTROL_NUMBER_MAP[field][1] == "%" else (0, 1000)
+
+
+def validate_config_fields(fields: dict[str, Any]) -> dict[str, int]:
+    """Check values for the writable config fields, return them as sent to the API.
+
+    Numbers are coerced to int within number_bounds(), selects accept the
+    option key (e.g. "forced") or its value. Raises ValueError.
+    """
+    validated: dict[str, int] = {}
+    for key, value in fields.items():
+        if key in CONTROL_NUMBER_MAP:
+            if not CONTROL_NUMBER_MAP[key][3]:
+                raise ValueError(f"{key} is read-only")
+            number = _to_int(value)
+            low, high = number_bounds(key)
+            if number is None or not low <= number <= high:
+                raise ValueError(f"{key} must be a number between {low} and {high}, got {value!r}")
+            validated[key] = number
+        elif key in CONTROL_SELECT_MAP:
+            if not CONTROL_SELECT_MAP[key][3]:
+                raise ValueError(f"{key} is read-only")
+            options = {str(item["Key"]): int(item["Value"]) for item in CONTROL_SELECT_MAP[key][4]}
+            if value in options:
+                validated[key] = options[value]
+            elif _to_int(value) in options.values():
+                validated[key] = _to_int(value)
+            else:
+                raise ValueError(f"{key} must be one of {', '.join(options)}, got {value!r}")
+        else:
+            raise ValueError(f"Unknown or read-only config field {key}")
+    return validated
+
+
+def config_key(field: str) -> str:
+    """Listener context key of one config field."""
+    return f"config.{field}"
+
+
+def soc_icon(soc: float | None) -> str:
+    """Return the battery icon for a state of charge in 10 % steps."""
+    if soc is None:
+        return "mdi:battery-remove"
+    d = round(soc / 10) * 10
+    if d == 0:
+        return "mdi:battery-outline"
+    elif d == 100:
+        return "mdi:battery"
+    return "mdi:battery-" + str(d)
+
+
+# Compiled DERIVED_SENSOR_MAP expressions: fn(payload, derived values so far)
+Expression = Callable[[dict[str, Any], dict[str, Any]], Any]
+
+
+def _binary(op: str, left: Expression, right: Expression) -> Expression:
+    def evaluate(data, derived):
+        a, b = left(data, derived), right(data, derived)
+        if a is None or b is None:
+            return None
+        if op == "add":
+            return a + b
+        if op == "sub":
+            return a - b
+        if op == "mul":
+            return a * b
+        if op == "div":
+            return a / b if b else None
+        if op == "min":
+            return min(a, b)
+        return max(a, b)
+
+    return evaluate
+
+
+def _aggregate(op: str, array_key: str, item_key: str) -> Expression:
+    reduce = {"array_sum": sum, "array_min": min, "array_max": max}[op]
+
+    def evaluate(data, derived):
+        values = [_to_float(item.get(item_key)) for item in data.get(array_key) or ()]
+        if None in values:
+            return None
+        # sum of no packs is 0, min/max of no packs is unknown
+        return reduce(values) if values or op == "array_sum" else None
+
+    return evaluate
+
+
+def _sign(value: Expression, labels: tuple) -> Expression:
+    negative, zero, positive = labels
+
+    def evaluate(data, derived):
+        number = value(data, derived)
+        if number is None:
+            return None
+        return positive if number > 0 else negative if number < 0 else zero
+
+    return evaluate
+
+
+def compile_expression(expr) -> Expression:
+    """Turn a DERIVED_SENSOR_MAP expression into a function, validating it once."""
+    if isinstance(expr, bool) or expr is None:
+        raise ValueError(f"Invalid expression {expr!r}")
+    if isinstance(expr, (int, float)):
+        return lambda data, derived: expr
+    if isinstance(expr, str):
+        if expr in DERIVED_SENSOR_MAP:
+            return lambda data, derived: derived.get(expr)
+        return lambda data, derived: _to_float(data.get(expr))
+    op, *args = expr
+    if op in ("add", "sub", "mul", "div", "min", "max") and len(args) == 2:
+        return _binary(op, compile_expression(args[0]), compile_expression(args[1]))
+    if op in ("array_sum", "array_min", "array_max") and len(args) == 2:
+        return _aggregate(op, *args)
+    if op == "sign" and len(args) == 2 and len(args[1]) == 3:
+        return _sign(compile_expression(args[0]), tuple(args[1]))
+    if op == "soc_icon" and len(args) == 1:
+        value = compile_expression(args[0])
+        return lambda data, derived: soc_icon(value(data, derived))
+    raise ValueError(f"Invalid expression {expr!r}")
+
+
+def _with_precision(value: Expression, precision: int | None) -> Expression:
+    if precision is None:
+        return value
+
+    def evaluate(data, derived):
+        number = value(data, derived)
+        if not isinstance(number, (int, float)):
+            return number
+        return int(round(number)) if precision == 0 else round(number, precision)
+
+    return evaluate
+
+
+def _compile_derived() -> tuple[tuple[str, Expression, Expression | None], ...]:
+    compiled = []
+    for key, (_tk, _unit, icon, expr, precision, _sc, _dc, _enabled) in DERIVED_SENSOR_MAP.items():
+        icon_fn = None if icon is None or isinstance(icon, str) else compile_expression(icon)
+        compiled.append((key, _with_precision(compile_expression(expr), precision), icon_fn))
+    return tuple(compiled)
+
+
+# Compiled once at import: (key, value, icon or None for a fixed icon)
+DERIVED_SENSORS = _compile_derived()
+
+
+def derived_icon_key(key: str) -> str:
+    """Flat key of a derived sensor's computed icon."""
+    return f"{key}.icon"
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetrySnapshot:
+    """Immutable, pre-computed view of one /api/device/last payload.
+
+    Built once per poll by the coordinator, so entity properties are plain
+    attribute reads instead of re-deriving values from the raw dict.
+    """
+
+    raw: dict[str, Any] = field(repr=False)
+    device_id: str | None
+    date: int | None
+    last_update: str | None
+    values: dict[str, Any]
+    soc: float | None
+    soc_icon: str
+    # DERIVED_SENSOR_MAP values and the icons of those with a computed icon
+    derived: dict[str, Any]
+    derived_icons: dict[str, str | None]
+    converters: tuple[dict, ...]
+    batteries: tuple[dict, ...]
+    flat: dict[str, Any] = field(repr=False)
+
+    def get(self, key: str, default=None):
+        """Dict-style access to the raw payload."""
+        return self.raw.get(key, default)
+
+    def number(self, key: str) -> float | None:
+        """Numeric value of a derived key or telemetry field, None if missing or invalid."""
+        value = self.derived.get(key) if key in self.derived else self.raw.get(key)
+        if value is None or isinstance(value, bool):
+            return None
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+
+    def changed_keys(self, previous: TelemetrySnapshot | None) -> set[str] | None:
+        """Return the flat keys that differ from the previous snapshot.
+
+        None means there is nothing to compare against (first payload).
+        """
+        if previous is None:
+            return None
+        old, new = previous.flat, self.flat
+        changed = {key for key, value in new.items() if old.get(key, _MISSING) != value}
+        changed.update(key for key in old if key not in new)
+        return changed
+
+    @classmethod
+    def from_payload(cls, data: dict[str, Any]) -> TelemetrySnapshot:
+        """Parse a telemetry payload (output of project_telemetry) once."""
+        values: dict[str, Any] = {}
+        for key, (_tk, _unit, _icon, force_int, _sc, _dc) in SENSOR_MAP.items():
+            value = data.get(key)
+            if value is not None and force_int:
+                try:
+                    value = int(round(float(value)))
+                except (ValueError, TypeError):
+                    value = None
+            values[key] = value
+
+        soc = _to_float(data.get("SOC", 0))
+
+        derived: dict[str, Any] = {}
+        for key, value_fn, _icon_fn in DERIVED_SENSORS:
+            derived[key] = value_fn(data, derived)
+        # Icons after all values, they may refer to any derived key
+        derived_icons = {key: icon_fn(data, derived) for key, _value_fn, icon_fn in DERIVED_SENSORS if icon_fn}
+
+        ts = data.get("date")
+        last_update = datetime.fromtimestamp(ts / 1000).isoformat() if ts else None
+
+        # Flat view for change detection: scalars, array lengths and layouts,
+        # "<array>.<index>.<field>" entries, plus the derived values and icons.
+        flat = {key: value for key, value in data.items() if key not in ARRAY_KEYS}
+        for array_key in ARRAY_KEYS:
+            items = data.get(array_key) or ()
+            flat[array_key] = len(items)
+            for index, item in enumerate(items):
+                prefix = f"{array_key}.{index}."
+                for item_key, value in item.items():
+                    flat[prefix + item_key] = value
+            flat[f"{array_key}.layout"] = tuple(tuple(item) for item in items)
+        flat.update(derived)
+        for key, icon in derived_icons.items():
+            flat[derived_icon_key(key)] = icon
+
+        return cls(
+            raw=data,
+            device_id=data.get("deviceId"),
+            date=ts,
+            last_update=last_update,
+            values=values,
+            soc=soc,
+            soc_icon=soc_icon(soc),
+            derived=derived,
+            derived_icons=derived_icons,
+            converters=tuple(data.get("convertersInfo") or ()),
+            batteries=tuple(data.get("batteriesInfo") or ()),
+            flat=flat,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceConfig:
+    """Validated, typed view of one /api/device/config payload.
+
+    values holds every field of CONFIG_FIELD_TYPES, coerced once (None if
+    missing or invalid) with aliases like meterIP resolved. raw is the
+    unwrapped payload as received, it is persisted and merged into writes.
+    version counts the configs the coordinator accepted.
+    """
+
+    raw: dict[str, Any] = field(repr=False)
+    version: int
+    device_id: str | None
+    values: dict[str, Any]
+
+    def get(self, key: str, default=None):
+        """Typed value of a known field, raw value otherwise."""
+        if key in self.values:
+            value = self.values[key]
+            return default if value is None else value
+        return self.raw.get(key, default)
+
+    def changed_fields(self, previous: DeviceConfig | None) -> set[str]:
+        """Return the typed fields whose value differs from the previous config."""
+        if previous is None:
+            return set(self.values)
+        return {key for key, value in self.values.items() if previous.values.get(key) != value}
+
+    @classmethod
+    def from_payload(cls, data: dict[str, Any], version: int = 1) -> DeviceConfig:
+        """Unwrap, normalize and type a config payload."""
+        if isinstance(data.get("data"), dict):
+            data = data["data"]
+        values: dict[str, Any] = {}
+        for key, coerce in CONFIG_FIELD_TYPES.items():
+            value = data.get(key)
+            if value is None:
+                for alias in CONFIG_FIELD_ALIASES.get(key, ()):
+                    value = data.get(alias)
+                    if value is not None:
+                        break
+            values[key] = coerce(value)
+        device_id = data.get("deviceId")
+        return cls(
+            raw=data,
+            version=version,
+            device_id=device_id if isinstance(device_id, str) else None,
+            values=values,
+        )
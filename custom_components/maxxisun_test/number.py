@@ -1,19 +1,19 @@
 import logging
 from typing import Optional
 
-import aiohttp
 from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 from homeassistant.helpers.entity import (
     DeviceInfo,
     EntityCategory,
 )
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity, UpdateFailed
 
 from .const import DOMAIN, CONTROL_NUMBER_MAP
 from .coordinator import APICoordinator
+from .models import config_key, number_bounds
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,26 +21,8 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Set up number entities using the shared APICoordinator."""
     data = hass.data[DOMAIN][entry.entry_id]
-    session = async_get_clientsession(hass)
-    api_interval = int(data.get("API_POLL_INTERVAL"))
-
-    coordinator: Optional[APICoordinator] = data.get("coordinator")
-    if not coordinator:
-        coordinator = APICoordinator(
-            hass=hass,
-            session=session,
-            token=data["token"],
-            api_poll_interval=api_interval,
-            ignoreSSL=data["ignoreSSL"],
-        )
-        hass.data[DOMAIN][entry.entry_id]["coordinator"] = coordinator
-
-    # Load config once to initialize values
-    try:
-        await coordinator.async_config_entry_first_refresh()
-        # await coordinator.async_get_config()
-    except Exception as err:  # noqa: BLE001
-        _LOGGER.warning("Initial config load failed: %s", err)
+    # Created and refreshed once in __init__.async_setup_entry
+    coordinator: APICoordinator = data["coordinator"]
 
     device_id = coordinator.data.get("deviceId", "unknown") if coordinator.data else "unknown"
     entities = []
@@ -59,7 +41,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             )
         )
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class DeviceConfigNumber(CoordinatorEntity, NumberEntity):
@@ -75,7 +57,8 @@ class DeviceConfigNumber(CoordinatorEntity, NumberEntity):
         icon: Optional[str] = None,
         read_only: bool = False,
     ):
-        super().__init__(coordinator)
+        # Only notified when this field of the device config changed
+        super().__init__(coordinator, context=(config_key(field),))
         self._attr_translation_key = translation_key
         self._field = field
         self._device_id = device_id
@@ -85,9 +68,8 @@ class DeviceConfigNumber(CoordinatorEntity, NumberEntity):
         self._attr_icon = icon or "mdi:numeric"
         self._attr_entity_category = EntityCategory.CONFIG
         self._attr_unit_of_measurement = unit
-        # Reasonable bounds for numeric inputs (0-100 for percentages, 0-1000 for W, etc.)
-        self._attr_native_min_value = 0
-        self._attr_native_max_value = 1000
+        # 0-100 for percentages, 0-1000 otherwise; the apply_config service checks the same
+        self._attr_native_min_value, self._attr_native_max_value = number_bounds(field)
         self._attr_native_step = 1
         self._read_only = read_only
 
@@ -101,18 +83,13 @@ class DeviceConfigNumber(CoordinatorEntity, NumberEntity):
         )
 
     @property
-    def native_value(self):
-        cfg = self.coordinator.config or {}
-        if isinstance(cfg, dict) and "data" in cfg and isinstance(cfg["data"], dict):
-            cfg = cfg["data"]
+    def extra_state_attributes(self):
+        return self.coordinator.freshness_attributes() or None
 
-        value = cfg.get(self._field) if isinstance(cfg, dict) else None
-        if value is None:
-            return None
-        try:
-            return int(round(float(value)))
-        except (ValueError, TypeError):
-            return None
+    @property
+    def native_value(self):
+        # Typed once by DeviceConfig, includes optimistic values of pending writes
+        return self.coordinator.config_value(self._field)
 
     @property
     def read_only(self) -> bool:
@@ -128,5 +105,6 @@ class DeviceConfigNumber(CoordinatorEntity, NumberEntity):
             await self.coordinator.async_set_config_field(self._field, int(round(value)))
             # # await self.coordinator.async_get_config()  # refresh
             self.async_write_ha_state()
-        except (aiohttp.ClientError, TimeoutError) as err:
-            _LOGGER.error("Failed updating %s: %s", self._field, err)
+        except (UpdateFailed, ConfigEntryAuthFailed) as err:
+            # Transport errors arrive wrapped in UpdateFailed, the value was rolled back
+            raise HomeAssistantError(f"Failed updating {self._field}: {err}") from err
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from array import array
+from collections import deque
+
+from .const import ADAPTIVE_MIN_INTERVAL, ROLLING_KEYS, ROLLING_WINDOWS
+from .models import TelemetrySnapshot
+
+AGGREGATES = ("min", "max", "mean")
+# Samples per ring buffer: the longest window at the fastest poll interval
+CAPACITY = max(ROLLING_WINDOWS.values()) // ADAPTIVE_MIN_INTERVAL + 1
+# Attributes the rolling aggregates add to their sensors, e.g. max_15m. They
+# change with every sample and are not written to the recorder.
+ROLLING_ATTRIBUTES = frozenset(f"{aggregate}_{name}" for name in ROLLING_WINDOWS for aggregate in AGGREGATES)
+
+
+def rolling_key(key: str) -> str:
+    """Listener key of a field's rolling aggregates, e.g. Pr.rolling."""
+    return f"{key}.rolling"
+
+
+class _Window:
+    """Running state of one window over a RollingBuffer."""
+
+    __slots__ = ("span", "start", "weighted", "low", "high")
+
+    def __init__(self, span: int):
+        self.span = span
+        # Sequence number of the oldest sample inside the window
+        self.start = 0
+        # Sum of value * ms until the next sample, over the samples inside
+        self.weighted = 0.0
+        # Min/max candidates (sequence numbers), values ascending/descending
+        self.low: deque[int] = deque()
+        self.high: deque[int] = deque()
+
+
+class RollingBuffer:
+    """Ring buffer of one field's recent samples with windowed min/max/mean.
+
+    Values are kept as float32 (array("f")) next to the device's sample time
+    (ms, array("q")), so memory is fixed by the capacity. push() is
+    amortized O(1): every window keeps a running time-weighted sum and
+    monotonic deques of its min/max candidates, samples leaving it (too old,
+    or beyond the capacity) are subtracted. The mean is time-weighted
+    from the oldest to the newest sample inside the window.
+    """
+
+    __slots__ = ("_times", "_values", "_capacity", "_count", "windows")
+
+    def __init__(self, windows: dict[str, int], capacity: int = CAPACITY):
+        # One spare slot: the sample being overwritten has always left every window
+        self._times = array("q", bytes(8 * (capacity + 1)))
+        self._values = array("f", bytes(4 * (capacity + 1)))
+        self._capacity = capacity
+        self._count = 0
+        self.windows = {name: _Window(span * 1000) for name, span in windows.items()}
+
+    def push(self, date: int, value: float) -> None:
+        """Add a sample (device time in ms, newer than the last one)."""
+        times, values = self._times, self._values
+        size = len(values)
+        seq = self._count
+        slot = seq % size
+        times[slot] = date
+        values[slot] = value
+        value = values[slot]
+        self._count = seq + 1
+        previous = (seq - 1) % size
+        step = values[previous] * (date - times[previous]) if seq else 0.0
+        oldest = seq - self._capacity
+        for window in self.windows.values():
+            start = window.start
+            if start < seq:
+                window.weighted += step
+            low, high = window.low, window.high
+            while low and values[low[-1] % size] >= value:
+                low.pop()
+            low.append(seq)
+            while high and values[high[-1] % size] <= value:
+                high.pop()
+            high.append(seq)
+            # Drop samples that are too old or beyond the capacity
+            limit = date - window.span
+            while start < seq and (start <= oldest or times[start % size] < limit):
+                slot = start % size
+                window.weighted -= values[slot] * (times[(start + 1) % size] - times[slot])
+                if low[0] == start:
+                    low.popleft()
+                if high[0] == start:
+                    high.popleft()
+                start += 1
+            if start == seq:
+                # Single sample left, drop the rounding error of the sum
+                window.weighted = 0.0
+            window.start = start
+
+    def samples(self, name: str) -> tuple[list[int], list[float]]:
+        """Times and values of the samples inside a window, oldest first."""
+        times, values = self._times, self._values
+        size = len(values)
+        slots = [seq % size for seq in range(self.windows[name].start, self._count)]
+        return [times[slot] for slot in slots], [values[slot] for slot in slots]
+
+    def aggregate(self, name: str) -> tuple[float, float, float] | None:
+        """(min, max, mean) of a window, None before the first sample."""
+        if not self._count:
+            return None
+        times, values = self._times, self._values
+        size = len(values)
+        window = self.windows[name]
+        last = (self._count - 1) % size
+        duration = times[last] - times[window.start % size]
+        mean = window.weighted / duration if duration > 0 else values[last]
+        return values[window.low[0] % size], values[window.high[0] % size], mean
+
+
+class RollingStats:
+    """Rolling buffers of the ROLLING_KEYS, fed with every new sample."""
+
+    __slots__ = ("buffers", "_date")
+
+    def __init__(self, keys=ROLLING_KEYS, windows=ROLLING_WINDOWS):
+        self.buffers = {key: RollingBuffer(windows) for key in keys}
+        self._date: int | None = None
+
+    def add(self, snapshot: TelemetrySnapshot) -> list[str]:
+        """Push one sample, return the rolling keys that moved."""
+        date = snapshot.date
+        if date is None or (self._date is not None and date <= self._date):
+            return []
+        self._date = date
+        changed = []
+        for key, buffer in self.buffers.items():
+            value = snapshot.number(key)
+            if value is not None:
+                buffer.push(date, value)
+                changed.append(rolling_key(key))
+        return changed
+
+    def value(self, key: str, name: str, aggregate: str) -> float | None:
+        """One aggregate (min / max / mean) of a key's window, rounded."""
+        result = self.buffers[key].aggregate(name)
+        return None if result is None else round(result[AGGREGATES.index(aggregate)], 2)
+
+    def attributes(self, key: str) -> dict[str, float]:
+        """min_/max_/mean_<window> of a key, empty before the first sample."""
+        attributes = {}
+        for name in self.buffers[key].windows:
+            result = self.buffers[key].aggregate(name)
+            if result is not None:
+                for aggregate, value in zip(AGGREGATES, result):
+                    attributes[f"{aggregate}_{name}"] = round(value, 2)
+        return attributes
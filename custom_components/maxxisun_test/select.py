@@ -1,16 +1,16 @@
 import logging
 from typing import Optional
 
-import aiohttp
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity, UpdateFailed
 
 from .const import CONTROL_SELECT_MAP, DOMAIN
 from .coordinator import APICoordinator
+from .models import config_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,25 +18,8 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Set up select entities using the shared APICoordinator."""
     data = hass.data[DOMAIN][entry.entry_id]
-    session = async_get_clientsession(hass)
-    api_interval = int(data.get("API_POLL_INTERVAL"))
-
-    coordinator: Optional[APICoordinator] = data.get("coordinator")
-    if not coordinator:
-        coordinator = APICoordinator(
-            hass=hass,
-            session=session,
-            token=data["token"],
-            api_poll_interval=api_interval,
-            ignoreSSL=data["ignoreSSL"],
-        )
-        hass.data[DOMAIN][entry.entry_id]["coordinator"] = coordinator
-
-    # Ensure we have initial data/config to populate current_option
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as err:  # noqa: BLE001
-        _LOGGER.warning("Initial load failed: %s", err)
+    # Created and refreshed once in __init__.async_setup_entry
+    coordinator: APICoordinator = data["coordinator"]
 
     device_id = coordinator.data.get("deviceId", "unknown") if coordinator.data else "unknown"
 
@@ -54,7 +37,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             )
         )
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class DeviceConfigSelect(CoordinatorEntity, SelectEntity):
@@ -70,7 +53,8 @@ class DeviceConfigSelect(CoordinatorEntity, SelectEntity):
         read_only: bool,
         options: list[dict],
     ):
-        super().__init__(coordinator)
+        # Only notified when this field of the device config changed
+        super().__init__(coordinator, context=(config_key(field),))
         self._attr_translation_key = translation_key
         self._attr_unique_id = f"{device_id}_test_{field}"
         self._attr_suggested_object_id = f"{device_id}_{field}".lower()
@@ -107,23 +91,16 @@ class DeviceConfigSelect(CoordinatorEntity, SelectEntity):
         )
 
     @property
-    def current_option(self) -> Optional[str]:
-        cfg = self.coordinator.config or {}
-        if isinstance(cfg, dict) and "data" in cfg and isinstance(cfg["data"], dict):
-            cfg = cfg["data"]
-
-        raw_value = cfg.get(self._field) if isinstance(cfg, dict) else None
-        if raw_value is None:
-            return None
-        try:
-            value_int = int(raw_value)
-        except (TypeError, ValueError):
-            return None
-        return self._label_by_value.get(value_int)
+    def extra_state_attributes(self):
+        return self.coordinator.freshness_attributes() or None
 
     @property
-    def available(self) -> bool:
-        return super().available and self.coordinator.last_update_success
+    def current_option(self) -> Optional[str]:
+        # Typed once by DeviceConfig, includes optimistic values of pending writes
+        value = self.coordinator.config_value(self._field)
+        if value is None:
+            return None
+        return self._label_by_value.get(value)
 
     async def async_select_option(self, option: str) -> None:
         if self._read_only:
@@ -138,5 +115,6 @@ class DeviceConfigSelect(CoordinatorEntity, SelectEntity):
         try:
             await self.coordinator.async_set_config_field(self._field, value)
             self.async_write_ha_state()
-        except (aiohttp.ClientError, TimeoutError) as err:
-            _LOGGER.error("Failed updating %s: %s", self._field, err)
+        except (UpdateFailed, ConfigEntryAuthFailed) as err:
+            # Transport errors arrive wrapped in UpdateFailed, the value was rolled back
+            raise HomeAssistantError(f"Failed updating {self._field}: {err}") from err
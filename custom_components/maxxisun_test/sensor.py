@@ -1,24 +1,43 @@
 import logging
-from datetime import timedelta, datetime
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity import (
     DeviceInfo, 
     EntityCategory
 )
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import UnitOfEnergy, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 
-from .const import CONTROL_DIAGNOSTIC_MAP, DOMAIN, SENSOR_MAP
+from .const import (
+    ARRAY_GENERIC_TRANSLATION,
+    ARRAY_RETIRE_SAMPLES,
+    ARRAY_SENSOR_MAP,
+    CONTROL_DIAGNOSTIC_MAP,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_STATISTICS_STATE_INTERVAL,
+    DOMAIN,
+    DERIVED_SENSOR_MAP,
+    ENERGY_SENSOR_MAP,
+    ESTIMATE_SENSOR_MAP,
+    POWER_FILTER_KEYS,
+    ROLLING_KEYS,
+    ROLLING_SENSOR_MAP,
+    SENSOR_MAP,
+)
 from .coordinator import APICoordinator
+from .models import ARRAY_KEYS, ARRAY_LAYOUT_KEYS, config_key, derived_icon_key
+from .rolling import ROLLING_ATTRIBUTES, rolling_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,101 +45,101 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Set up sensors from config entry using DataUpdateCoordinator."""
     data = hass.data[DOMAIN][entry.entry_id]
-    session = async_get_clientsession(hass)
-    api_interval = int(data.get("API_POLL_INTERVAL"))
-
-    _LOGGER.info("Coordinator init with Interval %s seconds", api_interval)
-
-    coordinator = hass.data[DOMAIN][entry.entry_id].get("coordinator")
-    if not coordinator:
-        coordinator = APICoordinator(
-            hass=hass,
-            session=session,
-            token=data["token"],
-            api_poll_interval=api_interval,
-            ignoreSSL=data["ignoreSSL"],
-        )
-        hass.data[DOMAIN][entry.entry_id]["coordinator"] = coordinator
-
-    await coordinator.async_config_entry_first_refresh()
+    # Created and refreshed once in __init__.async_setup_entry
+    coordinator: APICoordinator = data["coordinator"]
 
     device_id = coordinator.data.get("deviceId", "unknown") if coordinator.data else "unknown"
     entities = []
 
+    # deadband / min write interval per power sensor
+    options = data.get("options", {})
+    write_filters = {
+        key: (
+            float(options.get(f"{key}_deadband", DEFAULT_POWER_DEADBAND)),
+            float(options.get(f"{key}_min_interval", DEFAULT_MIN_WRITE_INTERVAL)),
+        )
+        for key in POWER_FILTER_KEYS
+    }
+    # Statistics-only: the coordinator writes hourly statistics from every
+    # sample (external statistic maxxisun_test:<device>_<key>), the state (and
+    # its recorder row) follows at a low rate. Without a state class the
+    # recorder compiles no second, coarser statistic from those states.
+    state_interval = float(options.get("statistics_state_interval", DEFAULT_STATISTICS_STATE_INTERVAL))
+    statistics_only = {key for key in POWER_FILTER_KEYS if options.get(f"{key}_statistics_only")}
+    for key in statistics_only:
+        deadband, min_interval = write_filters[key]
+        write_filters[key] = (deadband, max(min_interval, state_interval))
+
     # einfache Werte
     for key, (translation_key, unit, icon, force_int, stateClass, deviceClass) in SENSOR_MAP.items():
         _LOGGER.debug("Create ValueSensor %s", key)
-        entities.append(DeviceValueSensor(coordinator, key, translation_key, unit, device_id, icon, force_int, stateClass, deviceClass))
-
-    # converter array
-    for i, _ in enumerate(coordinator.data.get("convertersInfo", []) if coordinator.data else [], start=1):
         entities.append(
-            DeviceArraySensor(
+            DeviceValueSensor(
                 coordinator,
-                "converter_version",
-                "convertersInfo",
-                i - 1,
-                "version",
+                key,
+                translation_key,
+                unit,
                 device_id,
-                icon="mdi:information-outline",
-                translation_placeholders={"index": str(i)},
+                icon,
+                force_int,
+                None if key in statistics_only else stateClass,
+                deviceClass,
+                write_filter=write_filters.get(key),
+                rolling=key if key in ROLLING_KEYS else None,
             )
         )
 
-    # battery array
-    for i, _ in enumerate(coordinator.data.get("batteriesInfo", []) if coordinator.data else [], start=1):
+    # calced Sensors, values are computed once per poll by the snapshot
+    for key, definition in DERIVED_SENSOR_MAP.items():
+        translation_key, unit, icon, _expr, _precision, stateClass, deviceClass, enabled = definition
+        _LOGGER.debug("Create CalcedValueSensor %s", key)
         entities.append(
-            DeviceArraySensor(
+            DeviceCalcedValueSensor(
                 coordinator,
-                "battery_capacity",
-                "batteriesInfo",
-                i - 1,
-                "batteryCapacity",
+                key,
+                translation_key,
+                unit,
                 device_id,
-                unit="Wh",
-                icon="mdi:battery",
-                translation_placeholders={"index": str(i)},
+                icon if isinstance(icon, str) else None,
+                None if key in statistics_only else stateClass,
+                deviceClass,
+                write_filter=write_filters.get(key),
+                enabled_default=enabled,
+                rolling=key if key in ROLLING_KEYS else None,
             )
         )
 
-    # calced Sensors
-    _LOGGER.debug("Create CalcedValueSensor BatteryCharging")
-    entity_BatteryCharging = DeviceCalcedValueSensor(
-        coordinator,
-        "BatteryCharging",
-        "battery_charging",
-        None,
-        device_id,
-        "mdi:battery-outline",
-        False,
-    )
-    entities.append(entity_BatteryCharging)
-
-    _LOGGER.debug("Create CalcedValueSensor PowerBattery")
-    entity_PowerBattery = DeviceCalcedValueSensor(
-        coordinator,
-        "PowerBattery",
-        "power_battery",
-        "W",
-        device_id,
-        "mdi:battery-outline",
-        True,
-        SensorStateClass.MEASUREMENT,
-        SensorDeviceClass.POWER
-    )
-    entities.append(entity_PowerBattery)
-
-    _LOGGER.debug("Create CalcedValueSensor BatteryCapacity")
-    entity_BatteryCapacity = DeviceCalcedValueSensor(
-        coordinator,
-        "BatteryCapacity",
-        "battery_capacity_total",
-        "Wh",
-        device_id,
-        "mdi:battery-outline",
-        True,
-    )
-    entities.append(entity_BatteryCapacity)
+    # energy totals, integrated by the coordinator from every sample
+    for key, (translation_key, _source, _direction, icon) in ENERGY_SENSOR_MAP.items():
+        _LOGGER.debug("Create EnergySensor %s", key)
+        entities.append(DeviceEnergySensor(coordinator, key, translation_key, device_id, icon))
+
+    # battery runtime estimates towards the maxSOC/minSOC config values
+    for key, (translation_key, field, direction, icon) in ESTIMATE_SENSOR_MAP.items():
+        _LOGGER.debug("Create RuntimeSensor %s", key)
+        entities.append(DeviceRuntimeSensor(coordinator, key, translation_key, field, direction, device_id, icon))
+
+    # rolling window aggregates, opt-in
+    for key, (translation_key, source, window, aggregate, icon) in ROLLING_SENSOR_MAP.items():
+        if source in SENSOR_MAP:
+            _tk, unit, _icon, _force_int, _sc, deviceClass = SENSOR_MAP[source]
+        else:
+            _tk, unit, _icon, _expr, _precision, _sc, deviceClass, _enabled = DERIVED_SENSOR_MAP[source]
+        _LOGGER.debug("Create RollingSensor %s", key)
+        entities.append(
+            DeviceRollingSensor(
+                coordinator,
+                key,
+                translation_key,
+                source,
+                window,
+                aggregate,
+                device_id,
+                unit,
+                icon,
+                deviceClass,
+            )
+        )
 
     # diagnostic config sensors
     for field, (translation_key, unit, icon, _is_writable) in CONTROL_DIAGNOSTIC_MAP.items():
@@ -136,23 +155,171 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             )
         )
 
-    async_add_entities(entities, True)
+    # effective (adaptive) poll interval
+    entities.append(DevicePollIntervalSensor(coordinator, device_id))
 
-    # Eigenes Intervall erzwingen
-    poll_interval = timedelta(seconds=api_interval)
+    # request statistics, opt-in
+    for translation_key in ("poll_latency_p50", "poll_latency_p95", "poll_error_rate"):
+        entities.append(DeviceRequestStatsSensor(coordinator, translation_key, device_id))
 
-    async def force_refresh(_):
-        _LOGGER.debug("Foreced refresh triggered")
-        await coordinator.async_request_refresh()
+    # Entities are driven by the coordinator's own update_interval, no extra
+    # refresh per entity on add.
+    async_add_entities(entities)
 
-    async_track_time_interval(hass, force_refresh, poll_interval)
+    # converter / battery arrays, follow packs being added or removed
+    ArraySensorManager(hass, entry, coordinator, device_id, async_add_entities).async_setup()
 
 
+class ArraySensorManager:
+    """Adds and retires the per-index sensors of convertersInfo/batteriesInfo.
 
+    New indices/fields get their sensors right away. A payload without an
+    array (or with something else than a list) says nothing about the
+    packs, a sensor only retires once its index/field was missing from
+    ARRAY_RETIRE_SAMPLES new samples in a row, so a cloud hiccup does not
+    drop registry entries with their names and areas. Listens to the
+    layout keys and the sample date; a poll where no layout changed and
+    nothing is missing costs one comparison.
+    """
 
-class BaseDeviceSensor(SensorEntity):
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator: APICoordinator, device_id, async_add_entities):
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._device_id = device_id
+        self._async_add_entities = async_add_entities
+        self._entities: dict[str, DeviceArraySensor] = {}
+        # Registry entries without an entity (packs gone while HA was not
+        # running), by unique id suffix
+        self._orphans: dict[str, str] = {}
+        # New samples in a row each index/field was missing from
+        self._missing: dict[str, int] = {}
+        self._layouts: tuple | None = None
+        self._date: int | None = None
+
+    @callback
+    def async_setup(self) -> None:
+        wanted, _known = self._wanted()
+        # Entries of packs that disappeared while HA was not running retire
+        # like any other missing pack
+        registry = er.async_get(self._hass)
+        prefix = f"{self._device_id}_test_"
+        prefixes = tuple(f"{prefix}{array_key}_" for array_key in ARRAY_KEYS)
+        for reg_entry in er.async_entries_for_config_entry(registry, self._entry.entry_id):
+            key = reg_entry.unique_id.removeprefix(prefix)
+            if reg_entry.domain == "sensor" and reg_entry.unique_id.startswith(prefixes) and key not in wanted:
+                self._orphans[key] = reg_entry.entity_id
+        self._async_update()
+        self._entry.async_on_unload(
+            self._coordinator.async_add_listener(self._async_update, context=(*ARRAY_LAYOUT_KEYS, "date"))
+        )
+
+    def _wanted(self) -> tuple[dict[str, tuple[str, int, str]], set[str]]:
+        """Return the array sensors the current payload calls for by unique id suffix, and the arrays it has."""
+        snapshot = self._coordinator.data
+        wanted: dict[str, tuple[str, int, str]] = {}
+        known: set[str] = set()
+        if not snapshot:
+            return wanted, known
+        for array_key, items in (("convertersInfo", snapshot.converters), ("batteriesInfo", snapshot.batteries)):
+            # project_telemetry drops arrays that are not a list
+            if array_key not in snapshot.raw:
+                continue
+            known.add(array_key)
+            for index, item in enumerate(items):
+                if not isinstance(item, dict):
+                    continue
+                for value_key, value in item.items():
+                    if not isinstance(value, (list, dict)):
+                        wanted[f"{array_key}_{index}_{value_key}"] = (array_key, index, value_key)
+        return wanted, known
+
+    @callback
+    def _async_update(self) -> None:
+        snapshot = self._coordinator.data
+        if snapshot is None:
+            return
+        # An absent and an empty array have the same layout
+        layouts = tuple((key in snapshot.raw, snapshot.flat.get(f"{key}.layout")) for key in ARRAY_KEYS)
+        if layouts == self._layouts and not self._missing:
+            return
+        self._layouts = layouts
+        new_sample = snapshot.date is None or snapshot.date != self._date
+        self._date = snapshot.date
+        self._async_apply(*self._wanted(), new_sample)
+
+    @callback
+    def _async_apply(self, wanted: dict[str, tuple[str, int, str]], known: set[str], new_sample: bool) -> None:
+        new = []
+        for key, (array_key, index, value_key) in wanted.items():
+            self._missing.pop(key, None)
+            self._orphans.pop(key, None)
+            if key not in self._entities:
+                self._entities[key] = entity = self._create(array_key, index, value_key)
+                new.append(entity)
+        if new:
+            _LOGGER.debug("Adding %d array sensors", len(new))
+            self._async_add_entities(new)
+        if not new_sample:
+            return
+
+        for key in [*self._entities, *self._orphans]:
+            if key in wanted or key.split("_", 1)[0] not in known:
+                continue
+            self._missing[key] = missing = self._missing.get(key, 0) + 1
+            if missing >= ARRAY_RETIRE_SAMPLES:
+                self._async_retire(key)
+
+    @callback
+    def _async_retire(self, key: str) -> None:
+        registry = er.async_get(self._hass)
+        self._missing.pop(key, None)
+        entity = self._entities.pop(key, None)
+        entity_id = entity.entity_id if entity is not None else self._orphans.pop(key)
+        _LOGGER.debug("Retiring array sensor %s", entity_id)
+        if entity_id is not None and registry.async_get(entity_id) is not None:
+            # Removing the registry entry also removes the entity
+            registry.async_remove(entity_id)
+        elif entity is not None and entity.hass is not None:
+            self._hass.async_create_task(entity.async_remove(force_remove=True))
+
+    def _create(self, array_key: str, index: int, value_key: str) -> "DeviceArraySensor":
+        placeholders = {"index": str(index + 1)}
+        known = ARRAY_SENSOR_MAP[array_key].get(value_key)
+        if known is not None:
+            translation_key, unit, icon, stateClass, deviceClass = known
+            enabled = True
+        else:
+            translation_key, unit, icon, stateClass, deviceClass = (
+                ARRAY_GENERIC_TRANSLATION[array_key],
+                None,
+                "mdi:information-outline",
+                None,
+                None,
+            )
+            placeholders["field"] = value_key
+            enabled = False
+        return DeviceArraySensor(
+            self._coordinator,
+            translation_key,
+            array_key,
+            index,
+            value_key,
+            self._device_id,
+            unit=unit,
+            icon=icon,
+            translation_placeholders=placeholders,
+            stateClass=stateClass,
+            deviceClass=deviceClass,
+            enabled_default=enabled,
+        )
+
+
+class BaseDeviceSensor(CoordinatorEntity, SensorEntity):
     """Basisklasse mit Device-Zuordnung."""
 
+    _unrecorded_attributes = ROLLING_ATTRIBUTES
+
     def __init__(
         self,
         coordinator,
@@ -165,8 +332,15 @@ class BaseDeviceSensor(SensorEntity):
         deviceClass=None,
         name=None,
         translation_placeholders=None,
+        dependency_keys=None,
+        write_filter=None,
+        rolling=None,
     ):
-        self.coordinator = coordinator
+        # dependency_keys: payload keys this entity is notified for,
+        # rolling: ROLLING_KEYS field whose window aggregates are attributes
+        if rolling is not None:
+            dependency_keys = (*dependency_keys, rolling_key(rolling))
+        super().__init__(coordinator, context=tuple(dependency_keys) if dependency_keys else None)
         if name is not None:
             self._attr_name = name
         if translation_key is not None:
@@ -184,6 +358,13 @@ class BaseDeviceSensor(SensorEntity):
         if stateClass is not None:
             self._attr_state_class = stateClass
         self._state = None
+        self._deadband, self._min_write_interval = write_filter or (0.0, 0.0)
+        self._written_value = None
+        self._written_at = 0.0
+        self._written_available = None
+        # Write of a throttled change once the minimum interval has passed
+        self._trailing_write: CALLBACK_TYPE | None = None
+        self._rolling = rolling
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -194,10 +375,59 @@ class BaseDeviceSensor(SensorEntity):
             model=f"{self._device_id}".upper(),
         )
 
-    async def async_update(self):
-        """Erzwingt manuelles Update (nur bei Serviceaufruf nötig)."""
-        _LOGGER.debug("Update triggered")
-        await self.coordinator.async_request_refresh()
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state, honouring the deadband and minimum write interval.
+
+        A change inside the minimum interval is written once the interval
+        has passed, with the value current by then.
+        """
+        if self._deadband or self._min_write_interval:
+            value = self.native_value
+            now = self.hass.loop.time()
+            if (
+                self.available == self._written_available
+                and isinstance(value, (int, float))
+                and isinstance(self._written_value, (int, float))
+            ):
+                if abs(value - self._written_value) < self._deadband:
+                    return
+                wait = self._written_at + self._min_write_interval - now
+                if wait > 0:
+                    if self._trailing_write is None:
+                        self._trailing_write = async_call_later(self.hass, wait, self._async_write_trailing)
+                    return
+            self._cancel_trailing_write()
+            self._written_value = value
+            self._written_at = now
+            self._written_available = self.available
+        self.async_write_ha_state()
+
+    @callback
+    def _async_write_trailing(self, _now) -> None:
+        self._trailing_write = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _cancel_trailing_write(self) -> None:
+        if self._trailing_write is not None:
+            self._trailing_write()
+            self._trailing_write = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        self._cancel_trailing_write()
+
+    @property
+    def extra_state_attributes(self):
+        snapshot = self.coordinator.data
+        attributes = {}
+        if snapshot and snapshot.last_update:
+            attributes["last_update"] = snapshot.last_update
+        attributes.update(self.coordinator.freshness_attributes())
+        if self._rolling is not None:
+            attributes.update(self.coordinator.rolling.attributes(self._rolling))
+        return attributes
 
 
 class DeviceValueSensor(BaseDeviceSensor):
@@ -214,52 +444,42 @@ class DeviceValueSensor(BaseDeviceSensor):
         force_int=False,
         stateClass=None,
         deviceClass=None,
+        write_filter=None,
+        rolling=None,
     ):
-        super().__init__(coordinator, translation_key, key, device_id, unit, icon, stateClass, deviceClass)
+        super().__init__(
+            coordinator,
+            translation_key,
+            key,
+            device_id,
+            unit,
+            icon,
+            stateClass,
+            deviceClass,
+            dependency_keys=(key,),
+            write_filter=write_filter,
+            rolling=rolling,
+        )
         self._key = key
         self._force_int = force_int
 
     @property
     def native_value(self):
-        data = self.coordinator.data
-        if not data:
+        snapshot = self.coordinator.data
+        if not snapshot:
             return None
-        value = data.get(self._key)
-        if value is not None and self._force_int:
-            try:
-                value = int(round(float(value)))
-            except (ValueError, TypeError):
-                value = None
-        return value
+        return snapshot.values.get(self._key)
 
     @property
     def icon(self):
         if self._key != "SOC":
             return self._attr_icon
-        data = self.coordinator.data or {}
-        try:
-            soc = float(data.get("SOC", 0) or 0)
-        except (ValueError, TypeError):
-            soc = 0.0
-            return "mdi:battery-remove"
-        d = round(soc / 10) * 10
-        if d == 0:
-            return "mdi:battery-outline"
-        elif d == 100:
-            return "mdi:battery"
-        return "mdi:battery-" + str(d)
-
-    @property
-    def extra_state_attributes(self):
-        data = self.coordinator.data or {}
-        ts = data.get("date")
-        if ts:
-            return {"last_update": datetime.fromtimestamp(ts / 1000).isoformat()}
-        return {}
+        snapshot = self.coordinator.data
+        return snapshot.soc_icon if snapshot else "mdi:battery-outline"
 
 
 class DeviceCalcedValueSensor(BaseDeviceSensor):
-    """Sensor für einfache Werte."""
+    """Sensor für berechnete Werte aus DERIVED_SENSOR_MAP."""
 
     def __init__(
         self,
@@ -269,80 +489,42 @@ class DeviceCalcedValueSensor(BaseDeviceSensor):
         unit,
         device_id,
         icon=None,
-        force_int=True,
         stateClass=None,
-        deviceClass=None
+        deviceClass=None,
+        write_filter=None,
+        enabled_default=True,
+        rolling=None,
     ):
-        super().__init__(coordinator, translation_key, key, device_id, unit, icon, stateClass, deviceClass)
+        super().__init__(
+            coordinator,
+            translation_key,
+            key,
+            device_id,
+            unit,
+            icon,
+            stateClass,
+            deviceClass,
+            # A computed icon (e.g. following the SOC) changes on its own key
+            dependency_keys=(key, derived_icon_key(key)),
+            write_filter=write_filter,
+            rolling=rolling,
+        )
         self._key = key
-        self._force_int = force_int
+        self._attr_entity_registry_enabled_default = enabled_default
 
     @property
     def native_value(self):
-        data = self.coordinator.data or {}
-        if self._key == "BatteryCapacity":
-            array = data.get("batteriesInfo", [])
-            calcCapacity = 0.0
-            try:
-                for index in range(len(array)):
-                    capacity = float(array[index].get("batteryCapacity", 0) or 0)
-                    calcCapacity += capacity
-            except (ValueError, TypeError):
-                calcCapacity += 0.0
-            val = round(calcCapacity)
-            return int(val) if self._force_int else val
-
-        try:
-            pv = float(data.get("PV_power_total", 0) or 0)
-            pccu = float(data.get("Pccu", 0) or 0)
-        except (ValueError, TypeError):
-            pv, pccu = 0.0, 0.0
-        diff = pv - pccu
-
-        if self._key == "BatteryCharging":
-            d = round(diff)
-            if d == 0:
-                return "Idle"
-            return "Charging" if d > 0 else "Discharging"
-
-        # Default: PowerBattery -> round to zero decimals
-        val = round(diff)
-        return int(val) if self._force_int else val
+        snapshot = self.coordinator.data
+        if not snapshot:
+            return None
+        return snapshot.derived.get(self._key)
 
     @property
     def icon(self):
-        data = self.coordinator.data or {}
-        if self._key == "BatteryCharging" or self._key == "PowerBattery":
-            try:
-                pv = float(data.get("PV_power_total", 0) or 0)
-                pccu = float(data.get("Pccu", 0) or 0)
-            except (ValueError, TypeError):
-                pv, pccu = 0.0, 0.0
-            d = round(pv - pccu)
-            if d == 0:
-                return "mdi:battery-outline"
-            return "mdi:battery-arrow-up-outline" if d > 0 else "mdi:battery-arrow-down-outline"
-        elif self._key == "BatteryCapacity":
-            try:
-                soc = float(data.get("SOC", 0) or 0)
-            except (ValueError, TypeError):
-                soc = 0.0
-                return "mdi:battery-remove"
-            d = round(soc / 10) * 10
-            if d == 0:
-                return "mdi:battery-outline"
-            elif d == 100:
-                return "mdi:battery"
-            return "mdi:battery-" + str(d)
-        return self._attr_icon
-
-    @property
-    def extra_state_attributes(self):
-        data = self.coordinator.data or {}
-        ts = data.get("date")
-        if ts:
-            return {"last_update": datetime.fromtimestamp(ts / 1000).isoformat()}
-        return {}
+        snapshot = self.coordinator.data
+        if not snapshot:
+            return self._attr_icon
+        return snapshot.derived_icons.get(self._key) or self._attr_icon
 
 
 class DeviceArraySensor(BaseDeviceSensor):
@@ -359,6 +541,9 @@ class DeviceArraySensor(BaseDeviceSensor):
         unit=None,
         icon=None,
         translation_placeholders=None,
+        stateClass=None,
+        deviceClass=None,
+        enabled_default=True,
     ):
         super().__init__(
             coordinator,
@@ -367,18 +552,25 @@ class DeviceArraySensor(BaseDeviceSensor):
             device_id,
             unit,
             icon,
+            stateClass,
+            deviceClass,
             translation_placeholders=translation_placeholders,
+            dependency_keys=(f"{array_key}.{index}.{value_key}", "SOC")
+            if value_key == "batteryCapacity"
+            else (f"{array_key}.{index}.{value_key}",),
         )
         self._array_key = array_key
         self._index = index
         self._value_key = value_key
+        # Generic fields of unknown meaning start disabled
+        self._attr_entity_registry_enabled_default = enabled_default
 
     @property
     def native_value(self):
-        data = self.coordinator.data
-        if not data:
+        snapshot = self.coordinator.data
+        if not snapshot:
             return None
-        array = data.get(self._array_key, [])
+        array = snapshot.batteries if self._array_key == "batteriesInfo" else snapshot.converters
         if len(array) > self._index:
             return array[self._index].get(self._value_key)
         return None
@@ -387,25 +579,164 @@ class DeviceArraySensor(BaseDeviceSensor):
     def icon(self):
         if self._value_key != "batteryCapacity":
             return self._attr_icon
-        data = self.coordinator.data or {}
+        snapshot = self.coordinator.data
+        return snapshot.soc_icon if snapshot else "mdi:battery-outline"
+
+
+class DeviceEnergySensor(BaseDeviceSensor, RestoreSensor):
+    """Energy total (kWh) from the coordinator's EnergyIntegrator.
+
+    The last state is restored on start and the coordinator continues
+    counting from there.
+    """
+
+    def __init__(self, coordinator, key, translation_key, device_id, icon=None):
+        super().__init__(
+            coordinator,
+            translation_key,
+            key,
+            device_id,
+            UnitOfEnergy.KILO_WATT_HOUR,
+            icon,
+            SensorStateClass.TOTAL_INCREASING,
+            SensorDeviceClass.ENERGY,
+            dependency_keys=(key,),
+        )
+        self._key = key
+        self._attr_suggested_display_precision = 2
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        last = await self.async_get_last_sensor_data()
+        if last is None or last.native_value is None:
+            return
         try:
-            soc = float(data.get("SOC", 0) or 0)
+            self.coordinator.energy.restore(self._key, float(last.native_value))
         except (ValueError, TypeError):
-            soc = 0.0
-        d = round(soc / 10) * 10
-        if d == 0:
-            return "mdi:battery-outline"
-        elif d == 100:
-            return "mdi:battery"
-        return "mdi:battery-" + str(d)
+            _LOGGER.debug("Not restoring %s from %r", self._key, last.native_value)
+
+    @property
+    def native_value(self):
+        return round(self.coordinator.energy.totals[self._key], 4)
+
+
+class DeviceRollingSensor(BaseDeviceSensor):
+    """Min/max/mean of a ROLLING_KEYS field over a rolling window (disabled by default)."""
+
+    def __init__(self, coordinator, key, translation_key, source, window, aggregate, device_id, unit, icon, deviceClass):
+        super().__init__(
+            coordinator,
+            translation_key,
+            key,
+            device_id,
+            unit,
+            icon,
+            SensorStateClass.MEASUREMENT,
+            deviceClass,
+            dependency_keys=(rolling_key(source),),
+        )
+        self._source = source
+        self._window = window
+        self._aggregate = aggregate
+        self._attr_entity_registry_enabled_default = False
+
+    @property
+    def native_value(self):
+        return self.coordinator.rolling.value(self._source, self._window, self._aggregate)
+
+
+class DeviceRuntimeSensor(BaseDeviceSensor):
+    """Estimated minutes until SOC reaches a config limit (ESTIMATE_SENSOR_MAP)."""
+
+    _unrecorded_attributes = ROLLING_ATTRIBUTES | {"soc_rate"}
+
+    def __init__(self, coordinator, key, translation_key, field, direction, device_id, icon=None):
+        super().__init__(
+            coordinator,
+            translation_key,
+            key,
+            device_id,
+            UnitOfTime.MINUTES,
+            icon,
+            SensorStateClass.MEASUREMENT,
+            SensorDeviceClass.DURATION,
+            # SOC reaching the limit and limit changes count without a new rate
+            dependency_keys=("soc_rate", "SOC", config_key(field)),
+        )
+        self._field = field
+        self._direction = direction
+
+    @property
+    def native_value(self):
+        snapshot = self.coordinator.data
+        if not snapshot:
+            return None
+        target = self.coordinator.config_value(self._field)
+        return self.coordinator.runtime.minutes_to(snapshot.number("SOC"), target, self._direction)
 
     @property
     def extra_state_attributes(self):
-        data = self.coordinator.data or {}
-        ts = data.get("date")
-        if ts:
-            return {"last_update": datetime.fromtimestamp(ts / 1000).isoformat()}
-        return {}
+        attributes = super().extra_state_attributes
+        rate = self.coordinator.runtime.rate
+        if rate is not None:
+            attributes["soc_rate"] = round(rate, 2)
+        return attributes
+
+
+class DevicePollIntervalSensor(BaseDeviceSensor):
+    """Diagnostic sensor for the interval the coordinator currently polls at."""
+
+    def __init__(self, coordinator, device_id):
+        super().__init__(
+            coordinator,
+            "poll_interval",
+            "poll_interval",
+            device_id,
+            "s",
+            "mdi:timer-sync-outline",
+            SensorStateClass.MEASUREMENT,
+            SensorDeviceClass.DURATION,
+            dependency_keys=("poll_interval",),
+        )
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_value(self):
+        return self.coordinator.effective_interval
+
+
+class DeviceRequestStatsSensor(BaseDeviceSensor):
+    """Diagnostic sensor for the coordinator's poll latency / error rate (disabled by default)."""
+
+    def __init__(self, coordinator, translation_key, device_id):
+        is_rate = translation_key == "poll_error_rate"
+        super().__init__(
+            coordinator,
+            translation_key,
+            translation_key,
+            device_id,
+            "%" if is_rate else "ms",
+            "mdi:alert-circle-outline" if is_rate else "mdi:timer-outline",
+            SensorStateClass.MEASUREMENT,
+            None if is_rate else SensorDeviceClass.DURATION,
+            dependency_keys=("stats",),
+        )
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+
+    @property
+    def available(self) -> bool:
+        # Failed polls are what the error rate is about
+        return True
+
+    @property
+    def native_value(self):
+        stats = self.coordinator.stats
+        if self._attr_translation_key == "poll_latency_p50":
+            return stats.poll_latency(50)
+        if self._attr_translation_key == "poll_latency_p95":
+            return stats.poll_latency(95)
+        return stats.error_rate
 
 
 class DeviceConfigDiagnosticSensor(CoordinatorEntity, SensorEntity):
@@ -420,7 +751,7 @@ class DeviceConfigDiagnosticSensor(CoordinatorEntity, SensorEntity):
         unit=None,
         icon=None,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=(config_key(field),))
         self._attr_translation_key = translation_key
         self._field = field
         self._device_id = device_id
@@ -442,15 +773,5 @@ class DeviceConfigDiagnosticSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def native_value(self):
-        cfg = self.coordinator.config or {}
-        if isinstance(cfg, dict) and "data" in cfg and isinstance(cfg["data"], dict):
-            cfg = cfg["data"]
-
-        if not isinstance(cfg, dict):
-            return None
-
-        value = cfg.get(self._field)
-        # Backward/alternate key naming
-        if value is None and self._field == "meterIp":
-            value = cfg.get("meterIP")
-        return value
+        # Aliases (meterIP) are resolved by DeviceConfig
+        return self.coordinator.config_value(self._field)
@@ -0,0 +1,80 @@
+import logging
+
+import aiohttp
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .const import DOMAIN
+from .models import validate_config_fields
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_APPLY_CONFIG = "apply_config"
+
+APPLY_CONFIG_SCHEMA = vol.Schema(
+    vol.All(
+        {
+            vol.Optional("config_entry_id"): cv.string,
+            vol.Exclusive("preset", "config"): cv.string,
+            vol.Exclusive("fields", "config"): vol.All(dict, vol.Length(min=1)),
+        },
+        cv.has_at_least_one_key("preset", "fields"),
+    )
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_APPLY_CONFIG):
+        return
+
+    async def async_apply_config(call: ServiceCall) -> ServiceResponse:
+        """Apply a stored preset or a field map to one CCU with a single PUT."""
+        entry_id = call.data.get("config_entry_id")
+        entries = [
+            entry
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.entry_id in hass.data.get(DOMAIN, {}) and entry_id in (None, entry.entry_id)
+        ]
+        if len(entries) != 1:
+            raise ServiceValidationError(
+                f"config_entry_id must name one loaded {DOMAIN} entry"
+                if entry_id or not entries
+                else "Several CCUs are set up, config_entry_id is required"
+            )
+        entry = entries[0]
+
+        if "preset" in call.data:
+            fields = entry.options.get("presets", {}).get(call.data["preset"])
+            if fields is None:
+                raise ServiceValidationError(f"Unknown preset {call.data['preset']} for {entry.title}")
+        else:
+            fields = call.data["fields"]
+        try:
+            fields = validate_config_fields(fields)
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        try:
+            changed = await coordinator.async_apply_config(fields)
+        except (aiohttp.ClientError, TimeoutError, UpdateFailed) as err:
+            raise HomeAssistantError(f"Config update of {entry.title} failed: {err}") from err
+        _LOGGER.debug("apply_config on %s changed %s", entry.title, changed)
+        return {"changed": changed}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_CONFIG,
+        async_apply_config,
+        schema=APPLY_CONFIG_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the services when the last entry was unloaded."""
+    hass.services.async_remove(DOMAIN, SERVICE_APPLY_CONFIG)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+
+from .const import STATS_WINDOW
+
+
+def percentile(values, pct: float) -> float | None:
+    """Nearest-rank percentile, None without samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class EndpointStats:
+    """Latencies, sizes, status codes and retries of one API endpoint.
+
+    Latencies are kept for the last STATS_WINDOW requests only, everything
+    else is a running total.
+    """
+
+    __slots__ = ("latencies", "statuses", "requests", "errors", "retries", "bytes", "decode_time")
+
+    def __init__(self):
+        self.latencies: deque[float] = deque(maxlen=STATS_WINDOW)
+        self.statuses: Counter = Counter()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.decode_time = 0.0
+
+    def record(self, latency: float, status: int | str, size: int = 0) -> None:
+        """Record one request; status is the HTTP status or the exception name."""
+        self.requests += 1
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+        self.bytes += size
+        if isinstance(status, str) or status >= 400:
+            self.errors += 1
+
+    def as_dict(self) -> dict:
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "bytes": self.bytes,
+            "latency_ms": {
+                "p50": ms(percentile(self.latencies, 50)),
+                "p95": ms(percentile(self.latencies, 95)),
+                "max": ms(max(self.latencies, default=None)),
+            },
+            "decode_ms": round(self.decode_time * 1000, 1),
+        }
+
+
+class RequestStats:
+    """Per-endpoint request statistics plus the cost of whole poll cycles."""
+
+    def __init__(self):
+        self.endpoints: dict[str, EndpointStats] = {}
+        # Poll cycles: duration and outcome of the last STATS_WINDOW polls
+        self.polls: deque[float] = deque(maxlen=STATS_WINDOW)
+        self.poll_failures: deque[bool] = deque(maxlen=STATS_WINDOW)
+        self.dispatch_time = 0.0
+        self.dispatches = 0
+        # Telemetry samples: new ones with their age on arrival (s, device
+        # clock), and polls that got the previous sample again
+        self.samples = 0
+        self.duplicates = 0
+        self.sample_ages: deque[float] = deque(maxlen=STATS_WINDOW)
+
+    def endpoint(self, name: str) -> EndpointStats:
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats()
+        return stats
+
+    def record_poll(self, duration: float, failed: bool) -> None:
+        self.polls.append(duration)
+        self.poll_failures.append(failed)
+
+    def record_sample(self, age: float | None) -> None:
+        """Record a new sample's age on arrival, None for a repeated sample."""
+        if age is None:
+            self.duplicates += 1
+            return
+        self.samples += 1
+        self.sample_ages.append(age)
+
+    def record_dispatch(self, duration: float) -> None:
+        self.dispatches += 1
+        self.dispatch_time += duration
+
+    def poll_latency(self, pct: float) -> float | None:
+        """Poll duration percentile in ms."""
+        value = percentile(self.polls, pct)
+        return None if value is None else round(value * 1000, 1)
+
+    @property
+    def error_rate(self) -> float | None:
+        """Share of failed polls in % over the window."""
+        if not self.poll_failures:
+            return None
+        return round(100 * sum(self.poll_failures) / len(self.poll_failures), 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "polls": {
+                "count": len(self.polls),
+                "p50_ms": self.poll_latency(50),
+                "p95_ms": self.poll_latency(95),
+                "error_rate": self.error_rate,
+            },
+            "samples": {
+                "new": self.samples,
+                "duplicates": self.duplicates,
+                "age_p50_ms": None if not self.sample_ages else round(percentile(self.sample_ages, 50) * 1000),
+            },
+            "dispatch": {
+                "count": self.dispatches,
+                "total_ms": round(self.dispatch_time * 1000, 1),
+            },
+            "endpoints": {name: stats.as_dict() for name, stats in self.endpoints.items()},
+        }
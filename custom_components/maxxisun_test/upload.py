@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from statistics import median
+
+from .const import UPLOAD_HISTORY, UPLOAD_MARGIN, UPLOAD_MIN_SAMPLES
+
+
+class UploadTracker:
+    """Learns when the device uploads from the sample dates of the polls.
+
+    The period is only measured while polls are faster than the uploads: a
+    new sample right after a poll that still got the previous one is one
+    period after it (polls slower than the uploads only see multiples of it,
+    or their own spacing when the dates follow the requests). The delay
+    until an upload is readable (device clock offset included) lies between
+    the latest "poll time - date" that still got the previous sample and the
+    smallest one that got the new sample; next_upload() bisects between the
+    two until they are UPLOAD_MARGIN apart.
+    """
+
+    __slots__ = ("_date", "_gaps", "_lags", "_early", "_target", "period", "misses")
+
+    def __init__(self):
+        # Device date (ms) of the last new sample; gaps (s) measured after a
+        # repeated sample; poll time - date (s) of polls that got the sample
+        # (upper bounds) and of polls that were too early for the targeted
+        # one (lower bounds)
+        self._date: int | None = None
+        self._gaps: deque[float] = deque(maxlen=UPLOAD_HISTORY)
+        self._lags: deque[float] = deque(maxlen=UPLOAD_HISTORY)
+        self._early: deque[float] = deque(maxlen=UPLOAD_HISTORY)
+        # Device date (s) of the upload the next poll is aimed at
+        self._target: float | None = None
+        self.period: float | None = None
+        # Polls in a row that got the previous sample
+        self.misses = 0
+
+    def add(self, date: int | None, arrival: float) -> bool:
+        """Record a poll's sample date (arrival: wall time), False if it is not new."""
+        if date is None:
+            return True
+        last = self._date
+        target = self._target
+        if target is not None and date / 1000 < target and arrival > target:
+            # Too early for the targeted upload (got an older one)
+            early = arrival - target
+            if self._lags and early >= min(self._lags):
+                # Uploads got slower, what was readable by then no longer is
+                self._lags.clear()
+            self._early.append(early)
+        if date == last:
+            self.misses += 1
+            return False
+        if last is not None and date < last:
+            # Device clock jumped back, start over
+            self._lags.clear()
+            self._early.clear()
+            self.relearn()
+        elif target is not None and date / 1000 > target + UPLOAD_MARGIN:
+            # Newer than the upload aimed at: the uploads are off the learned grid
+            self.relearn()
+        elif last is not None and self.misses:
+            self._gaps.append((date - last) / 1000)
+            if len(self._gaps) >= UPLOAD_MIN_SAMPLES:
+                shortest = min(self._gaps)
+                self.period = median([gap for gap in self._gaps if gap < shortest * 1.5])
+        self.misses = 0
+        self._date = date
+        self._lags.append(arrival - date / 1000)
+        return True
+
+    def relearn(self) -> None:
+        """Forget the period, it is measured again from the next repeated samples."""
+        self._gaps.clear()
+        self._target = None
+        self.period = None
+
+    @property
+    def lag(self) -> float | None:
+        """Seconds from a sample's date until it was readable at the latest, None without samples."""
+        return min(self._lags, default=None)
+
+    def next_upload(self, earliest: float) -> float | None:
+        """Wall time to poll for the first upload readable at or after earliest, None while unknown."""
+        high = self.lag
+        if self.period is None or high is None:
+            return None
+        # Without a poll that was too early assume uploads are readable at their date
+        low = max(self._early, default=min(0.0, high - UPLOAD_MARGIN))
+        # Converged: just after the upload is readable, else probe halfway
+        offset = high + UPLOAD_MARGIN if high - low <= UPLOAD_MARGIN else (low + high) / 2
+        last = self._date / 1000
+        self._target = last + max(1, math.ceil((earliest - offset - last) / self.period)) * self.period
+        return self._target + offset
@@ -0,0 +1,122 @@
+"""Test helpers: Home Assistant on a virtual clock talking to the fake API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.core import HomeAssistant
+
+from custom_components.maxxisun_test import auth, coordinator
+from custom_components.maxxisun_test.const import DOMAIN
+from fake_server import FakeMaxxisunAPI, FaultConfig
+
+CCU = "ccu00001"
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock advance() moves forward.
+
+    Timers (the coordinators' refreshes, debounced saves) fire as soon as
+    the clock passed them, without waiting in real time. Wall clock time
+    (time.time) is not affected.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.offset = 0.0
+
+    def time(self) -> float:
+        return super().time() + self.offset
+
+
+@dataclass
+class Harness:
+    hass: HomeAssistant
+    api: FakeMaxxisunAPI
+
+    def requests(self, endpoint: str, status: int = 200) -> int:
+        """Requests the fake API answered for endpoint (last, config, login...) with status."""
+        return self.api.requests[(endpoint, status)]
+
+    def polls(self, ccu: str = CCU) -> int:
+        """Telemetry requests the fake API answered for one CCU."""
+        return self.api.polls[ccu]
+
+    async def async_add_entry(
+        self, ccu: str = CCU, options: dict | None = None, **data
+    ) -> config_entries.ConfigEntry:
+        """Add and set up a config entry like the config flow creates it."""
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title=ccu,
+            data={
+                "email": "test@example.com",
+                "ccu": ccu,
+                "token": None,
+                "API_POLL_INTERVAL": 30,
+                "ignoreSSL": False,
+                "adaptivePolling": False,
+                "API_POLL_INTERVAL_MAX": 120,
+                **data,
+            },
+            source=config_entries.SOURCE_USER,
+            options=options or {},
+            unique_id=ccu,
+        )
+        await self.hass.config_entries.async_add(entry)
+        await self.hass.async_block_till_done()
+        return entry
+
+    async def async_block_till_done(self) -> None:
+        """Wait for pending tasks, background tasks (e.g. the refresh after a cached start) included."""
+        hass = self.hass
+        await hass.async_block_till_done()
+        while tasks := [task for task in hass._background_tasks if not task.done()]:  # noqa: SLF001
+            await asyncio.wait(tasks)
+            await hass.async_block_till_done()
+
+    async def async_next_poll(self, ccu: str = CCU) -> None:
+        """Move the clock forward until the CCU was polled once more."""
+        polled = self.polls(ccu)
+        while self.polls(ccu) == polled:
+            await self.async_advance(1)
+
+    async def async_advance(self, seconds: float, step: float = 1.0) -> None:
+        """Move the clock forward in steps, letting due refreshes run to completion."""
+        loop = self.hass.loop
+        while seconds > 0:
+            delta = min(step, seconds)
+            loop.offset += delta
+            seconds -= delta
+            await asyncio.sleep(0)
+            await self.hass.async_block_till_done()
+
+
+@asynccontextmanager
+async def async_test_home_assistant(config_dir, monkeypatch, faults: FaultConfig | None = None) -> AsyncIterator[Harness]:
+    """Home Assistant with its registries loaded, the integration pointed at a fake API."""
+    api = FakeMaxxisunAPI(faults)
+    runner, base_url = await api.start()
+    monkeypatch.setattr(auth, "API_BASE_URL", base_url)
+    monkeypatch.setattr(coordinator, "API_BASE_URL", base_url)
+
+    hass = HomeAssistant(str(config_dir))
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    await hass.async_start()
+    try:
+        yield Harness(hass, api)
+    finally:
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+        await runner.cleanup()
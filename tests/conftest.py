@@ -0,0 +1,30 @@
+"""Runs coroutine tests on a VirtualClockLoop (see tests/common.py).
+
+Plain pytest is enough: the hook below plays the part of an asyncio plugin.
+"""
+
+import inspect
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# custom_components is imported as a namespace package, like HA's loader does;
+# tools/ holds the fake API server
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from tests.common import VirtualClockLoop  # noqa: E402
+
+
+def pytest_pyfunc_call(pyfuncitem):
+    """Run async def tests to completion on a fresh VirtualClockLoop."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}  # noqa: SLF001
+    loop = VirtualClockLoop()
+    try:
+        loop.run_until_complete(pyfuncitem.obj(**kwargs))
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+    return True
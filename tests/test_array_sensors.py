@@ -0,0 +1,110 @@
+"""Per-pack sensors of convertersInfo/batteriesInfo as packs come and go."""
+
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.maxxisun_test.const import ARRAY_RETIRE_SAMPLES, DOMAIN
+from fake_server import SimulatedCCU
+from tests.common import CCU, async_test_home_assistant
+
+ABSENT = object()
+
+
+def serve_telemetry(monkeypatch, overrides: dict) -> None:
+    """Let the fake CCUs' payloads follow overrides (ABSENT drops a key)."""
+    telemetry = SimulatedCCU.telemetry
+
+    def patched(self, *args):
+        payload = {**telemetry(self, *args), **overrides}
+        return {key: value for key, value in payload.items() if value is not ABSENT}
+
+    monkeypatch.setattr(SimulatedCCU, "telemetry", patched)
+
+
+def array_entries(hass, entry) -> dict[str, er.RegistryEntry]:
+    registry = er.async_get(hass)
+    return {
+        reg_entry.unique_id: reg_entry
+        for reg_entry in er.async_entries_for_config_entry(registry, entry.entry_id)
+        if "_batteriesInfo_" in reg_entry.unique_id or "_convertersInfo_" in reg_entry.unique_id
+    }
+
+
+def battery_unique_id(index: int) -> str:
+    return f"dev-{CCU}_test_batteriesInfo_{index}_batteryCapacity"
+
+
+async def test_missing_or_null_arrays_keep_pack_sensors(tmp_path, monkeypatch):
+    overrides = {}
+    serve_telemetry(monkeypatch, overrides)
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry()
+        before = array_entries(harness.hass, entry)
+        assert battery_unique_id(0) in before
+        registry = er.async_get(harness.hass)
+        registry.async_update_entity(before[battery_unique_id(0)].entity_id, name="Pack in the garage")
+
+        overrides.update(convertersInfo=ABSENT, batteriesInfo=None)
+        for _ in range(ARRAY_RETIRE_SAMPLES + 1):
+            await harness.async_next_poll()
+
+        after = array_entries(harness.hass, entry)
+        assert after.keys() == before.keys()
+        assert after[battery_unique_id(0)].name == "Pack in the garage"
+
+
+async def test_removed_pack_retires_after_consecutive_samples(tmp_path, monkeypatch):
+    overrides = {"batteriesInfo": [{"batteryCapacity": 2240}, {"batteryCapacity": 2240}]}
+    serve_telemetry(monkeypatch, overrides)
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry()
+        entity_id = array_entries(harness.hass, entry)[battery_unique_id(1)].entity_id
+        assert harness.hass.states.get(entity_id) is not None
+
+        overrides["batteriesInfo"] = [{"batteryCapacity": 2240}]
+        for _ in range(ARRAY_RETIRE_SAMPLES - 1):
+            await harness.async_next_poll()
+            assert battery_unique_id(1) in array_entries(harness.hass, entry)
+        await harness.async_next_poll()
+
+        entries = array_entries(harness.hass, entry)
+        assert battery_unique_id(1) not in entries
+        assert battery_unique_id(0) in entries
+        assert harness.hass.states.get(entity_id) is None
+
+
+async def test_a_pack_missing_once_keeps_its_sensor(tmp_path, monkeypatch):
+    overrides = {"batteriesInfo": [{"batteryCapacity": 2240}, {"batteryCapacity": 2240}]}
+    serve_telemetry(monkeypatch, overrides)
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry()
+
+        for packs in ([], [{"batteryCapacity": 2240}], *[[{"batteryCapacity": 2240}] * 2] * ARRAY_RETIRE_SAMPLES):
+            overrides["batteriesInfo"] = packs
+            await harness.async_next_poll()
+
+        assert battery_unique_id(1) in array_entries(harness.hass, entry)
+
+
+async def test_setup_without_arrays_keeps_registry_entries(tmp_path, monkeypatch):
+    """A restart whose first payload lacks the arrays does not drop the packs' entries."""
+    overrides = {}
+    serve_telemetry(monkeypatch, overrides)
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry()
+        before = array_entries(harness.hass, entry)
+        assert await harness.hass.config_entries.async_unload(entry.entry_id)
+
+        # No snapshot was persisted yet: the setup starts from the live payload
+        overrides.update(convertersInfo=ABSENT, batteriesInfo=ABSENT)
+        assert await harness.hass.config_entries.async_setup(entry.entry_id)
+        await harness.async_block_till_done()
+        assert not harness.hass.data[DOMAIN][entry.entry_id]["coordinator"].restored
+        for _ in range(ARRAY_RETIRE_SAMPLES):
+            await harness.async_next_poll()
+        assert array_entries(harness.hass, entry).keys() == before.keys()
+
+        # Packs gone while HA was not running retire like any other
+        overrides["batteriesInfo"] = []
+        for _ in range(ARRAY_RETIRE_SAMPLES):
+            await harness.async_next_poll()
+        assert not any("_batteriesInfo_" in unique_id for unique_id in array_entries(harness.hass, entry))
@@ -0,0 +1,67 @@
+"""Config writes: merged PUTs, optimistic values and errors surfaced to the caller."""
+
+from aiohttp import web
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.maxxisun_test.const import DOMAIN
+from fake_server import FakeMaxxisunAPI
+from tests.common import CCU, async_test_home_assistant
+
+
+async def test_put_without_config_in_response_keeps_the_written_values(tmp_path, monkeypatch):
+    put_config = FakeMaxxisunAPI.put_config
+
+    async def put_config_empty_body(self, request):
+        await put_config(self, request)
+        return web.Response(status=200)
+
+    monkeypatch.setattr(FakeMaxxisunAPI, "put_config", put_config_empty_body)
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry()
+        coordinator = harness.hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        device = harness.api.ccus[CCU].config
+        min_soc, max_soc = device["minSOC"] + 5, device["maxSOC"] - 5
+
+        first = harness.hass.async_create_task(coordinator.async_set_config_field("minSOC", min_soc))
+        await harness.async_advance(1)
+        assert first.done() and first.exception() is None
+        # Shown as written, not the value from before the PUT
+        assert coordinator.config_value("minSOC") == min_soc
+
+        second = harness.hass.async_create_task(coordinator.async_set_config_field("maxSOC", max_soc))
+        await harness.async_advance(1)
+        assert second.done() and second.exception() is None
+
+        # The second batch did not write the old minSOC back
+        assert device["minSOC"] == min_soc
+        assert device["maxSOC"] == max_soc
+
+
+async def test_failed_write_raises_a_user_facing_error(tmp_path, monkeypatch):
+    async def put_config_failing(self, request):
+        return web.Response(status=500)
+
+    monkeypatch.setattr(FakeMaxxisunAPI, "put_config", put_config_failing)
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        hass = harness.hass
+        await harness.async_add_entry()
+        registry = er.async_get(hass)
+        number_id = registry.async_get_entity_id("number", DOMAIN, f"dev-{CCU}_test_minSOC")
+        select_id = registry.async_get_entity_id("select", DOMAIN, f"dev-{CCU}_test_powerMeter")
+        min_soc = hass.states.get(number_id).state
+        option = next(
+            option for option in hass.states.get(select_id).attributes["options"]
+            if option != hass.states.get(select_id).state
+        )
+
+        for domain, service, data in (
+            ("number", "set_value", {"entity_id": number_id, "value": float(min_soc) + 5}),
+            ("select", "select_option", {"entity_id": select_id, "option": option}),
+        ):
+            call = hass.async_create_task(hass.services.async_call(domain, service, data, blocking=True))
+            await harness.async_advance(1)
+            assert isinstance(call.exception(), HomeAssistantError)
+
+        # Rolled back to the device's values
+        assert hass.states.get(number_id).state == min_soc
@@ -0,0 +1,20 @@
+"""Config entry diagnostics leave out credentials and LAN addresses."""
+
+import json
+
+from custom_components.maxxisun_test.diagnostics import async_get_config_entry_diagnostics
+from tests.common import CCU, async_test_home_assistant
+
+
+async def test_diagnostics_redact_credentials_and_meter_ip(tmp_path, monkeypatch):
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry(options={"presets": {"home": {"minSOC": 20, "meterIp": "10.0.0.7"}}})
+        meter_ip = harness.api.ccus[CCU].config["meterIp"]
+
+        diagnostics = await async_get_config_entry_diagnostics(harness.hass, entry)
+
+        dump = json.dumps(diagnostics, default=str)
+        for secret in (meter_ip, "10.0.0.7", CCU, "test@example.com"):
+            assert secret not in dump
+        assert diagnostics["coordinator"]["config"]["meterIp"] == "**REDACTED**"
+        assert diagnostics["entry"]["options"]["presets"]["home"] == {"minSOC": 20, "meterIp": "**REDACTED**"}
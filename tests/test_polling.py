@@ -0,0 +1,30 @@
+"""Requests per poll interval across setup and reloads."""
+
+from tests.common import async_test_home_assistant
+
+INTERVAL = 30
+INTERVALS = 4
+
+
+async def test_one_telemetry_request_per_interval_after_reload(tmp_path, monkeypatch):
+    """A reload replaces the entry's poller instead of stacking a second one."""
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry(API_POLL_INTERVAL=INTERVAL)
+        # A second entry keeps the hub and its HTTP session open, a poller
+        # left behind by the reload would still reach the API
+        await harness.async_add_entry(ccu="ccu00002", API_POLL_INTERVAL=INTERVAL)
+        await harness.async_advance(INTERVAL * 2)
+
+        for _ in range(2):
+            assert await harness.hass.config_entries.async_reload(entry.entry_id)
+            await harness.hass.async_block_till_done()
+        # Count from the first scheduled poll after the reloads
+        polled = harness.polls()
+        while harness.polls() == polled:
+            await harness.async_advance(1)
+        polled = harness.polls()
+
+        # Polls at +1..+N intervals; half an interval of slack keeps jitter off the edge
+        await harness.async_advance(INTERVAL * INTERVALS + INTERVAL / 2)
+
+        assert harness.polls() - polled == INTERVALS
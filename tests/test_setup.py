@@ -0,0 +1,75 @@
+"""Requests made while an entry starts up through __init__.async_setup_entry."""
+
+import asyncio
+import os
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.maxxisun_test.const import DOMAIN, STORAGE_SAVE_DELAY
+from fake_server import FakeMaxxisunAPI, make_jwt
+from tests.common import CCU, async_test_home_assistant
+
+
+async def test_cold_start_fetches_telemetry_and_config_once(tmp_path, monkeypatch):
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry()
+        await harness.async_block_till_done()
+
+        assert entry.state is ConfigEntryState.LOADED
+        assert harness.hass.states.async_entity_ids("sensor")
+        assert harness.hass.states.async_entity_ids("number")
+        assert harness.hass.states.async_entity_ids("select")
+        assert harness.requests("login") == 1
+        assert harness.requests("last") == 1
+        assert harness.requests("config") == 1
+
+
+async def test_cached_start_fetches_telemetry_and_config_once(tmp_path, monkeypatch):
+    """Entities start from the persisted snapshot, the live refresh runs once in the background."""
+    release = asyncio.Event()
+    device_last = FakeMaxxisunAPI.device_last
+
+    async def held_device_last(self, request):
+        await release.wait()
+        return await device_last(self, request)
+
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        hass = harness.hass
+        entry = await harness.async_add_entry()
+        await harness.async_advance(STORAGE_SAVE_DELAY + 1)
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await harness.async_block_till_done()
+        assert os.path.exists(hass.config.path(".storage", f"{DOMAIN}.{entry.entry_id}"))
+        harness.api.requests.clear()
+
+        # Hold the live telemetry until the restored state was checked
+        monkeypatch.setattr(FakeMaxxisunAPI, "device_last", held_device_last)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        assert coordinator.restored
+        entity_id = er.async_get(hass).async_get_entity_id("sensor", DOMAIN, f"dev-{CCU}_test_SOC")
+        state = hass.states.get(entity_id)
+        assert state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN)
+        assert state.attributes["restored"] is True
+        assert harness.requests("last") == 0
+
+        release.set()
+        await harness.async_block_till_done()
+
+        assert not coordinator.restored
+        assert harness.requests("last") == 1
+        assert harness.requests("config") == 1
+
+
+async def test_unreachable_cloud_retries_setup(tmp_path, monkeypatch):
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        harness.api.faults.error_rate = 1.0
+        entry = await harness.async_add_entry(token=make_jwt(CCU, 3600))
+
+        assert entry.state is ConfigEntryState.SETUP_RETRY
+        assert entry.entry_id not in harness.hass.data[DOMAIN]
+        assert not harness.hass.states.async_entity_ids("sensor")
@@ -0,0 +1,23 @@
+"""Statistics-only power sensors: no state class, so no recorder-compiled statistics."""
+
+from homeassistant.components.sensor import ATTR_STATE_CLASS, SensorStateClass
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.maxxisun_test.const import DOMAIN
+from custom_components.maxxisun_test.longterm import statistic_id
+from tests.common import CCU, async_test_home_assistant
+
+
+async def test_statistics_only_sensor_has_no_state_class(tmp_path, monkeypatch):
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        await harness.async_add_entry(options={"Pccu_statistics_only": True})
+        registry = er.async_get(harness.hass)
+
+        def attributes(key: str) -> dict:
+            entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"dev-{CCU}_test_{key}")
+            return harness.hass.states.get(entity_id).attributes
+
+        assert ATTR_STATE_CLASS not in attributes("Pccu")
+        assert attributes("Pr")[ATTR_STATE_CLASS] == SensorStateClass.MEASUREMENT
+        # The hourly statistics live under the external id the options text names
+        assert statistic_id(f"dev-{CCU}", "Pccu") == f"maxxisun_test:dev_{CCU}_pccu"
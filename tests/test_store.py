@@ -0,0 +1,39 @@
+"""The persisted snapshot: written at a fixed rate while polling and on unload."""
+
+import json
+
+from custom_components.maxxisun_test.const import DOMAIN, STORAGE_SAVE_DELAY
+from tests.common import async_test_home_assistant
+
+
+def stored(hass, entry) -> dict | None:
+    path = hass.config.path(".storage", f"{DOMAIN}.{entry.entry_id}")
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)["data"]
+    except FileNotFoundError:
+        return None
+
+
+async def test_snapshot_saved_while_polling_faster_than_the_save_delay(tmp_path, monkeypatch):
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry(API_POLL_INTERVAL=30)
+        await harness.async_advance(STORAGE_SAVE_DELAY + 1)
+        first = stored(harness.hass, entry)
+        assert first is not None
+
+        # Later saves carry later samples
+        await harness.async_advance(STORAGE_SAVE_DELAY * 3)
+        assert stored(harness.hass, entry)["telemetry"]["date"] > first["telemetry"]["date"]
+
+
+async def test_unload_writes_the_latest_sample(tmp_path, monkeypatch):
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry(API_POLL_INTERVAL=30)
+        await harness.async_advance(STORAGE_SAVE_DELAY + 45)
+        date = harness.hass.data[DOMAIN][entry.entry_id]["coordinator"].data.date
+
+        assert await harness.hass.config_entries.async_unload(entry.entry_id)
+        await harness.async_block_till_done()
+
+        assert stored(harness.hass, entry)["telemetry"]["date"] == date
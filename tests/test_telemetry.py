@@ -0,0 +1,51 @@
+"""Validation of telemetry payloads at the projection boundary."""
+
+import math
+
+from custom_components.maxxisun_test.const import DOMAIN
+from custom_components.maxxisun_test.models import TelemetrySnapshot, project_telemetry
+from custom_components.maxxisun_test.rolling import RollingStats
+from fake_server import SimulatedCCU
+from tests.common import async_test_home_assistant
+
+
+def test_float_date_is_truncated_to_int_ms():
+    snapshot = TelemetrySnapshot.from_payload(project_telemetry({"date": 1_700_000_000_000.7, "Pr": 12.5}))
+
+    assert snapshot.date == 1_700_000_000_000
+    assert type(snapshot.date) is int
+    rolling = RollingStats()
+    assert rolling.add(snapshot)
+    assert rolling.value("Pr", "15m", "max") == 12.5
+
+
+def test_invalid_dates_are_dropped():
+    for date in (math.nan, math.inf, True, "1700000000000", [1], 10**20, 1e300, -1, 0):
+        assert "date" not in project_telemetry({"date": date})
+
+
+def test_sample_with_implausible_date_has_no_date():
+    snapshot = TelemetrySnapshot.from_payload(project_telemetry({"date": 10**20, "Pr": 12.5}))
+
+    assert snapshot.date is None
+    assert snapshot.last_update is None
+    assert snapshot.number("Pr") == 12.5
+
+
+async def test_poll_with_float_date_updates(tmp_path, monkeypatch):
+    telemetry = SimulatedCCU.telemetry
+
+    def float_date(self, *args):
+        return {**telemetry(self, *args), "date": float(telemetry(self, *args)["date"])}
+
+    monkeypatch.setattr(SimulatedCCU, "telemetry", float_date)
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        entry = await harness.async_add_entry(API_POLL_INTERVAL=30)
+        await harness.async_advance(95)
+
+        coordinator = harness.hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        assert harness.requests("last") >= 3
+        assert coordinator.last_update_success
+        # Every poll got a new sample through energy, rolling windows and estimate
+        assert coordinator.stats.samples == harness.requests("last")
+        assert coordinator.rolling.attributes("Pr")
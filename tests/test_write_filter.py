@@ -0,0 +1,48 @@
+"""Minimum write interval of the power sensors: throttled changes are written late, not lost."""
+
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from custom_components.maxxisun_test import sensor
+from custom_components.maxxisun_test.const import DOMAIN
+from fake_server import SimulatedCCU
+from tests.common import async_test_home_assistant
+
+MIN_INTERVAL = 60
+
+
+async def test_throttled_change_is_written_after_the_interval(tmp_path, monkeypatch):
+    overrides = {"Pccu": 100}
+    telemetry = SimulatedCCU.telemetry
+    monkeypatch.setattr(SimulatedCCU, "telemetry", lambda self, *args: {**telemetry(self, *args), **overrides})
+    async with async_test_home_assistant(tmp_path, monkeypatch) as harness:
+        hass = harness.hass
+        entry = await harness.async_add_entry(API_POLL_INTERVAL=30)
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        # Without rolling attributes only a change of Pccu itself notifies it
+        entity = sensor.DeviceValueSensor(
+            coordinator, "Pccu", "power_out", "W", "filtered", None, True, write_filter=(0.0, MIN_INTERVAL)
+        )
+        platform = next(platform for platform in async_get_platforms(hass, DOMAIN) if platform.domain == "sensor")
+        await platform.async_add_entities([entity])
+
+        overrides["Pccu"] = 200
+        await harness.async_next_poll()
+        assert hass.states.get(entity.entity_id).state == "200"
+
+        # Inside the interval: held back, then written with the steady value
+        overrides["Pccu"] = 300
+        await harness.async_next_poll()
+        assert hass.states.get(entity.entity_id).state == "200"
+        await harness.async_advance(MIN_INTERVAL)
+        assert hass.states.get(entity.entity_id).state == "300"
+
+        # A pending write does not outlive the entity
+        for value in (400, 500):
+            overrides["Pccu"] = value
+            await harness.async_next_poll()
+        assert hass.states.get(entity.entity_id).state == "400"
+        assert entity._trailing_write is not None  # noqa: SLF001
+        await entity.async_remove()
+        assert entity._trailing_write is None  # noqa: SLF001
+        await harness.async_advance(MIN_INTERVAL)
+        assert hass.states.get(entity.entity_id).state != "500"
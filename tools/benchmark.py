@@ -0,0 +1,458 @@
+"""Microbenchmarks for entity state evaluation and coordinator update cost.
+
+Measures native_value (current_option) / icon / extra_state_attributes of the
+entity classes,
+APICoordinator._async_update_data against a canned in-memory response (a
+new upload per poll, and the same sample again) and
+the setup of all platforms, one poll cycle (update plus the state writes of
+all entities, which are added to Home Assistant) for payloads with 1 to 64
+batteries and converters, plus the time from entry setup until all entities
+were added with a slow cloud (STARTUP_LATENCY), once cold and once from the
+persisted snapshot, the energy integration, rolling windows and runtime estimate of
+one sample, and the decoding of the telemetry body (stdlib json + full parse
+against orjson + projection) for a realistic and an oversized payload.
+Results are in microseconds per call. tools/benchmark_presnapshot.json holds
+update_cycle of the dict-based implementation before TelemetrySnapshot
+(9d4ebf0, every entity reads the payload dict and writes its state each
+poll), measured the same way.
+
+    python tools/benchmark.py                # print results
+    python tools/benchmark.py --save         # write tools/benchmark_baseline.json
+    python tools/benchmark.py --compare      # compare with the baseline, exit 1 on regressions
+    python tools/benchmark.py --compare --baseline tools/benchmark_presnapshot.json
+
+Requires Home Assistant to be installed (the integration's runtime).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+import timeit
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "custom_components"))
+
+from homeassistant import bootstrap, config_entries, loader  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+
+from maxxisun_test import number, select, sensor  # noqa: E402
+from maxxisun_test.auth import TokenManager  # noqa: E402
+from homeassistant.helpers.storage import Store  # noqa: E402
+
+from maxxisun_test.const import CONTROL_SELECT_MAP, DOMAIN, STORAGE_VERSION  # noqa: E402
+from maxxisun_test.coordinator import APICoordinator  # noqa: E402
+from maxxisun_test.energy import EnergyIntegrator  # noqa: E402
+from maxxisun_test.estimate import RuntimeEstimator  # noqa: E402
+from maxxisun_test.models import TelemetrySnapshot, project_telemetry  # noqa: E402
+from maxxisun_test.rolling import RollingStats  # noqa: E402
+from homeassistant.util.json import json_loads_object  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+SIZES = (1, 4, 16, 64)
+# Selects report their state through current_option
+PROPERTIES = ("native_value", "current_option", "icon", "extra_state_attributes")
+# Simulated cloud round-trip for the startup measurement (s)
+STARTUP_LATENCY = 0.5
+
+
+def telemetry_payload(size: int) -> dict:
+    return {
+        "deviceId": "bench",
+        "date": 1_700_000_000_000,
+        "SOC": 57.3,
+        "wifiStrength": -61,
+        "Pccu": 412.6,
+        "Pr": 23.1,
+        "PV_power_total": 655.9,
+        "firmwareVersion": "1.4.2",
+        "convertersInfo": [{"version": f"2.{i}"} for i in range(size)],
+        "batteriesInfo": [{"batteryCapacity": 2240} for _ in range(size)],
+    }
+
+
+def oversized_payload(size: int) -> dict:
+    """Telemetry with fields and nested blobs the integration never reads."""
+    payload = telemetry_payload(size)
+    payload.update({f"debug{i}": {"samples": list(range(32)), "note": "x" * 64} for i in range(50)})
+    for key in ("convertersInfo", "batteriesInfo"):
+        for item in payload[key]:
+            item.update({"serial": "SN0000000000", "cells": [3.31] * 16, "temps": {"min": 21, "max": 24}})
+    return payload
+
+
+CONFIG_PAYLOAD = {
+    "deviceId": "bench",
+    "numberOfBatteries": 2,
+    "minSOC": 10,
+    "maxSOC": 95,
+    "maxOutputPower": 800,
+    "baseLoad": 0,
+    "threshold": 20,
+    "offlineOutput": 100,
+    "powerMeter": 9,
+    "ccuSpeed": 2,
+    "dcAlgorithm": 1,
+    "meterIp": "192.168.1.20",
+}
+
+
+class CannedResponse:
+    def __init__(self, payload, delay: float = 0.0):
+        self.delay = delay
+        self.status = 200
+        self.headers = {}
+        self._body = json.dumps(payload).encode()
+
+    async def __aenter__(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self._body
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+
+class CannedSession:
+    """Answers every request from memory, so only the client side is measured.
+
+    Each telemetry request returns the next upload (date + 30 s) unless
+    advance is False, then the device never uploads again. With vary the
+    power values change with every upload, SOC and the packs stay.
+    """
+
+    def __init__(self, telemetry: dict, delay: float = 0.0, advance: bool = True, vary: bool = False):
+        self._telemetry = telemetry
+        self._delay = delay
+        self._advance = advance
+        self._vary = vary
+
+    def get(self, url, **kwargs):
+        if url.endswith("/config"):
+            return CannedResponse(CONFIG_PAYLOAD, self._delay)
+        if self._advance:
+            self._telemetry["date"] += 30_000
+            if self._vary:
+                for key in ("Pccu", "Pr", "PV_power_total"):
+                    self._telemetry[key] = round(self._telemetry[key] % 800 + 7.3, 1)
+        return CannedResponse(self._telemetry, self._delay)
+
+    def put(self, url, **kwargs):
+        return CannedResponse(CONFIG_PAYLOAD, self._delay)
+
+
+class BenchEntry(SimpleNamespace):
+    """Just enough of a ConfigEntry for the platforms' setup."""
+
+    def async_create_background_task(self, hass, target, name):
+        return hass.async_create_background_task(target, name)
+
+    def async_on_unload(self, func) -> None:
+        pass
+
+
+def make_coordinator(
+    hass: HomeAssistant,
+    size: int,
+    delay: float = 0.0,
+    store: Store | None = None,
+    advance: bool = True,
+    vary: bool = False,
+) -> APICoordinator:
+    session = CannedSession(telemetry_payload(size), delay, advance, vary)
+    token_manager = TokenManager(hass, session, "bench@example.com", "bench", "token")
+    return APICoordinator(hass=hass, session=session, token_manager=token_manager, api_poll_interval=30, store=store)
+
+
+def entry_data(coordinator: APICoordinator, store: Store | None = None) -> dict:
+    return {
+        "coordinator": coordinator,
+        "API_POLL_INTERVAL": 30,
+        "API_POLL_INTERVAL_MAX": 120,
+        "adaptivePolling": False,
+        "ignoreSSL": False,
+        "hub": None,
+        "token_manager": coordinator._token_manager,  # noqa: SLF001
+        "store": store,
+        "options": {},
+    }
+
+
+async def setup_platforms(hass: HomeAssistant, entry: BenchEntry) -> list:
+    """Set up the platforms concurrently, like async_forward_entry_setups."""
+    created = []
+    await asyncio.gather(
+        *(
+            platform.async_setup_entry(hass, entry, lambda entities, *args: created.extend(entities))
+            for platform in (sensor, number, select)
+        )
+    )
+    return created
+
+
+async def add_to_hass(hass: HomeAssistant, entities: list) -> list[EntityPlatform]:
+    """Add the entities to Home Assistant, one entity platform per domain."""
+    platforms = []
+    for module in (sensor, number, select):
+        domain = module.__name__.rsplit(".", 1)[-1]
+        platform = EntityPlatform(
+            hass=hass,
+            logger=logging.getLogger(module.__name__),
+            domain=domain,
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        await platform.async_add_entities([entity for entity in entities if type(entity).__module__ == module.__name__])
+        platforms.append(platform)
+    return platforms
+
+
+def per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+async def bench_entities(hass: HomeAssistant, size: int, results: dict) -> None:
+    coordinator = make_coordinator(hass, size)
+    await coordinator.async_refresh()
+    entities = {
+        "DeviceValueSensor": sensor.DeviceValueSensor(coordinator, "SOC", "state_of_charge", "%", "bench", "mdi:battery"),
+        "DeviceCalcedValueSensor": sensor.DeviceCalcedValueSensor(
+            coordinator, "BatteryCapacity", "battery_capacity_total", "Wh", "bench", "mdi:battery-outline"
+        ),
+        "DeviceArraySensor": sensor.DeviceArraySensor(
+            coordinator, "battery_capacity", "batteriesInfo", size - 1, "batteryCapacity", "bench", unit="Wh"
+        ),
+        "DeviceConfigNumber": number.DeviceConfigNumber(coordinator, "min_soc", "minSOC", "bench", unit="%"),
+        "DeviceConfigSelect": select.DeviceConfigSelect(
+            coordinator,
+            "power_meter",
+            "powerMeter",
+            "bench",
+            icon=None,
+            read_only=False,
+            options=CONTROL_SELECT_MAP["powerMeter"][4],
+        ),
+    }
+    for name, entity in entities.items():
+        for prop in PROPERTIES:
+            if not hasattr(type(entity), prop) or (prop == "current_option" and name != "DeviceConfigSelect"):
+                continue
+            results[f"{name}.{prop}[{size}]"] = per_call_us(lambda e=entity, p=prop: getattr(e, p), 2000)
+
+
+async def bench_update(hass: HomeAssistant, size: int, results: dict) -> None:
+    # A new upload per poll, and polls that only get the last sample again
+    for label, advance in (("", True), ("_duplicate", False)):
+        coordinator = make_coordinator(hass, size, advance=advance)
+        await coordinator.async_refresh()
+        rounds = 200
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await coordinator._async_update_data()  # noqa: SLF001
+            best = min(best, time.perf_counter() - start)
+        results[f"APICoordinator._async_update_data{label}[{size}]"] = best / rounds * 1e6
+
+
+async def bench_cycle(hass: HomeAssistant, size: int, results: dict) -> None:
+    """One poll: fetch, parse, notify the entities and write their states."""
+    coordinator = make_coordinator(hass, size, vary=True)
+    await coordinator.async_refresh()
+    hass.data[DOMAIN] = {"bench": entry_data(coordinator)}
+    created = await setup_platforms(hass, BenchEntry(entry_id="bench", data={}, options={}))
+    platforms = await add_to_hass(hass, created)
+    rounds = 50
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await coordinator.async_refresh()
+        best = min(best, time.perf_counter() - start)
+    results[f"update_cycle[{size}]"] = best / rounds * 1e6
+    for platform in platforms:
+        await platform.async_reset()
+    await coordinator.async_shutdown()
+
+
+def bench_decode(size: int, results: dict) -> None:
+    for label, payload in (("realistic", telemetry_payload(size)), ("oversized", oversized_payload(size))):
+        body = json.dumps(payload).encode()
+        results[f"decode_stdlib_{label}[{size}]"] = per_call_us(
+            lambda b=body: TelemetrySnapshot.from_payload(json.loads(b)), 200
+        )
+        results[f"decode_projected_{label}[{size}]"] = per_call_us(
+            lambda b=body: TelemetrySnapshot.from_payload(project_telemetry(json_loads_object(b))), 200
+        )
+
+
+def bench_energy(results: dict) -> None:
+    """One integration step per sample, samples 30 s apart."""
+    samples = []
+    for index in range(1000):
+        payload = telemetry_payload(4)
+        payload["date"] += index * 30_000
+        payload["Pr"] = -payload["Pr"] if index % 2 else payload["Pr"]
+        samples.append(TelemetrySnapshot.from_payload(project_telemetry(payload)))
+
+    def integrate():
+        integrator = EnergyIntegrator()
+        for snapshot in samples:
+            integrator.add(snapshot)
+
+    results["EnergyIntegrator.add"] = min(timeit.repeat(integrate, number=1, repeat=5)) / len(samples) * 1e6
+
+
+def bench_rolling(results: dict) -> None:
+    """One sample into the rolling windows of every key, 5 s apart (rings wrap)."""
+    samples = []
+    for index in range(2000):
+        payload = telemetry_payload(4)
+        payload["date"] += index * 5_000
+        payload["Pr"] = payload["Pr"] * (index % 13)
+        payload["Pccu"] = payload["Pccu"] + index % 29
+        samples.append(TelemetrySnapshot.from_payload(project_telemetry(payload)))
+
+    def push():
+        rolling = RollingStats()
+        for snapshot in samples:
+            rolling.add(snapshot)
+
+    results["RollingStats.add"] = min(timeit.repeat(push, number=1, repeat=5)) / len(samples) * 1e6
+
+
+def bench_runtime(results: dict) -> None:
+    """Runtime estimate of one sample, 5 s apart with SOC rising (full regression window)."""
+    rolling = RollingStats()
+    samples = []
+    for index in range(1000):
+        payload = telemetry_payload(4)
+        payload["date"] += index * 5_000
+        payload["SOC"] = 40 + index // 60
+        snapshot = TelemetrySnapshot.from_payload(project_telemetry(payload))
+        rolling.add(snapshot)
+        samples.append(snapshot)
+
+    def update():
+        # The windows hold the last samples, only the estimator restarts
+        estimator = RuntimeEstimator()
+        for snapshot in samples[-200:]:
+            estimator.update(snapshot, rolling)
+
+    results["RuntimeEstimator.update"] = min(timeit.repeat(update, number=1, repeat=5)) / 200 * 1e6
+
+
+async def bench_platform_setup(hass: HomeAssistant, size: int, results: dict) -> None:
+    rounds = 20
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            coordinator = make_coordinator(hass, size)
+            await coordinator.async_refresh()
+            hass.data[DOMAIN] = {"bench": entry_data(coordinator)}
+            await setup_platforms(hass, BenchEntry(entry_id="bench", data={}, options={}))
+        best = min(best, time.perf_counter() - start)
+    results[f"platform_setup[{size}]"] = best / rounds * 1e6
+
+
+async def bench_startup(hass: HomeAssistant, size: int, results: dict) -> None:
+    """Time from setup start until the entities were added, cold and cached.
+
+    The request count at startup is covered by tests/test_setup.py.
+    """
+    store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.bench")
+    await store.async_save({"telemetry": telemetry_payload(size), "config": CONFIG_PAYLOAD, "saved_at": time.time()})
+    for label, entry_store in (("cold", None), ("cached", store)):
+        best = float("inf")
+        for _ in range(3):
+            coordinator = make_coordinator(hass, size, STARTUP_LATENCY, entry_store)
+            hass.data[DOMAIN] = {"bench": entry_data(coordinator, entry_store)}
+            entry = BenchEntry(entry_id="bench", data={}, options={})
+            start = time.perf_counter()
+            # What __init__.async_setup_entry does before forwarding the platforms
+            await coordinator.async_start(entry)
+            created = await setup_platforms(hass, entry)
+            best = min(best, time.perf_counter() - start)
+            assert created and coordinator.data is not None
+            # Let the background refresh of the cached run finish
+            await hass.async_block_till_done()
+            await coordinator.async_shutdown()
+        results[f"startup_{label}[{size}]"] = best * 1e6
+    await store.async_remove()
+
+
+async def run_all() -> dict:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # Registries, restore state and entity sources, for the entities of bench_cycle
+        loader.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await bootstrap.async_load_base_functionality(hass)
+        results: dict[str, float] = {}
+        for size in SIZES:
+            await bench_entities(hass, size, results)
+            await bench_update(hass, size, results)
+            await bench_cycle(hass, size, results)
+            bench_decode(size, results)
+            await bench_platform_setup(hass, size, results)
+            await bench_startup(hass, size, results)
+        bench_energy(results)
+        bench_rolling(results)
+        bench_runtime(results)
+    return {key: round(value, 3) for key, value in results.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> bool:
+    ok = True
+    for key, value in results.items():
+        base = baseline.get(key)
+        if not base:
+            print(f"{key:60s} {value:10.2f} us   (new)")
+            continue
+        ratio = value / base
+        flag = ""
+        # Sub-microsecond timings jitter by more than the tolerance
+        if ratio > 1 + tolerance and value - base > min_delta:
+            flag, ok = "  REGRESSION", False
+        print(f"{key:60s} {value:10.2f} us   x{ratio:5.2f}{flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", action="store_true", help="write results to the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare results with the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help=f"baseline file (default {BASELINE.name})")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown before failing")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="ignore slowdowns below this many us")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_all())
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())
+        if not compare(results, baseline, args.tolerance, args.min_delta):
+            sys.exit(1)
+    else:
+        for key, value in results.items():
+            print(f"{key:60s} {value:10.2f} us")
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
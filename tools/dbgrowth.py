@@ -0,0 +1,142 @@
+"""Recorder database growth per day: normal vs. statistics-only power sensors.
+
+Starts Home Assistant with the recorder on a temporary SQLite database and
+writes the power sensors' states for --hours of simulated time, once with a
+state per poll (normal mode) and once with a state every
+--state-interval seconds plus the hourly mean/min/max that HourlyStatistics
+collects from every poll, imported as external statistics
+(statistics-only mode). Prints rows and bytes per day for both as JSON.
+
+    python tools/dbgrowth.py --hours 6 --interval 5
+
+In normal mode the states carry state_class measurement, so the recorder
+also compiles 5-minute/hourly statistics from them (on the wall clock, not
+part of the measurement). Statistics-only states have no state class, their
+only long-term statistics are the imported external ones.
+Requires Home Assistant with the recorder's dependencies (SQLAlchemy).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "custom_components"))
+
+from homeassistant import config_entries, loader  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import entity_registry as er, recorder as recorder_helper, translation  # noqa: E402
+from homeassistant.setup import async_setup_component  # noqa: E402
+
+from maxxisun_test.const import DEFAULT_STATISTICS_STATE_INTERVAL, POWER_FILTER_KEYS  # noqa: E402
+from maxxisun_test.longterm import HourlyStatistics, async_import_hourly  # noqa: E402
+from maxxisun_test.models import TelemetrySnapshot, project_telemetry  # noqa: E402
+
+# 2026-01-01 00:00 UTC, on an hour boundary
+START_MS = 1_767_225_600_000
+DEVICE_ID = "dbgrowth"
+ATTRIBUTES = {
+    "unit_of_measurement": "W",
+    "device_class": "power",
+}
+
+
+def telemetry_payload(index: int, interval: int) -> dict:
+    """Sample `index` of a slowly varying day, `interval` s apart."""
+    return {
+        "deviceId": DEVICE_ID,
+        "date": START_MS + index * interval * 1000,
+        "SOC": 50 + index % 40,
+        "Pccu": 300 + index * 7 % 250,
+        "Pr": index * 13 % 400 - 200,
+        "PV_power_total": 500 + index * 11 % 300,
+        "convertersInfo": [{"version": "2.0"}],
+        "batteriesInfo": [{"batteryCapacity": 2240}],
+    }
+
+
+async def run_mode(hours: float, interval: int, state_interval: int | None) -> dict:
+    """Write one mode's rows into a fresh database and measure its growth."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+        translation.async_setup(hass)
+        await er.async_load(hass)
+        recorder_helper.async_initialize_recorder(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        db = os.path.join(config_dir, "growth.db")
+        assert await async_setup_component(
+            hass, "recorder", {"recorder": {"db_url": f"sqlite:///{db}", "commit_interval": 0}}
+        )
+        await hass.async_start()
+        from homeassistant.components.recorder import get_instance
+
+        instance = get_instance(hass)
+        await instance.async_db_ready
+        await instance.async_block_till_done()
+        size_before = os.path.getsize(db)
+
+        samples = int(hours * 3600 / interval)
+        step = max(1, (state_interval or interval) // interval)
+        hourly = HourlyStatistics(POWER_FILTER_KEYS) if state_interval else None
+        attributes = ATTRIBUTES if state_interval else {**ATTRIBUTES, "state_class": "measurement"}
+        states = statistics = 0
+        # One extra sample closes the last hour
+        for index in range(samples + 1):
+            snapshot = TelemetrySnapshot.from_payload(project_telemetry(telemetry_payload(index, interval)))
+            if hourly is not None and (finished := hourly.add(snapshot)):
+                async_import_hourly(hass, DEVICE_ID, finished)
+                statistics += sum(len(rows) for rows in finished.values())
+            if index < samples and index % step == 0:
+                for key in POWER_FILTER_KEYS:
+                    hass.states.async_set(f"sensor.{DEVICE_ID}_{key.lower()}", str(snapshot.number(key)), attributes)
+                states += len(POWER_FILTER_KEYS)
+            if index % 500 == 0:
+                await instance.async_block_till_done()
+        await hass.async_block_till_done()
+        await instance.async_block_till_done()
+        grown = os.path.getsize(db) - size_before
+        await hass.async_stop()
+
+    scale = 24 / hours
+    return {
+        "states_per_day": round(states * scale),
+        "statistics_rows_per_day": round(statistics * scale),
+        "bytes_per_day": round(grown * scale),
+        "measured": {"hours": hours, "states": states, "statistics_rows": statistics, "bytes": grown},
+    }
+
+
+async def run_all(hours: float, interval: int, state_interval: int) -> dict:
+    normal = await run_mode(hours, interval, None)
+    statistics_only = await run_mode(hours, interval, state_interval)
+    return {
+        "poll_interval": interval,
+        "state_interval": state_interval,
+        "sensors": len(POWER_FILTER_KEYS),
+        "normal": normal,
+        "statistics_only": statistics_only,
+        "reduction": round(normal["bytes_per_day"] / max(1, statistics_only["bytes_per_day"]), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=6, help="simulated hours per mode")
+    parser.add_argument("--interval", type=int, default=5, help="poll interval in s")
+    parser.add_argument(
+        "--state-interval",
+        type=int,
+        default=DEFAULT_STATISTICS_STATE_INTERVAL,
+        help="state interval in statistics-only mode in s",
+    )
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run_all(args.hours, args.interval, args.state_interval)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
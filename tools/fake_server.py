@@ -0,0 +1,295 @@
+"""Local fake of the Maxxisun cloud API for development and load tests.
+
+Implements /api/authentication/log-in, /api/device/last and
+/api/device/config (GET/PUT) for any number of simulated CCUs, with
+injectable latency, errors, 401s and 429s. With --upload-period the CCUs
+upload a new sample every N s (each on its own phase) and /api/device/last
+returns the last upload, as the real cloud does.
+
+    python tools/fake_server.py --port 8080 --latency 50 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+
+def _b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def make_jwt(ccu: str, ttl: float) -> str:
+    """Unsigned JWT with the claims the integration reads (exp)."""
+    header = _b64({"alg": "none", "typ": "JWT"})
+    payload = _b64({"ccu": ccu, "exp": int(time.time() + ttl)})
+    return f"{header}.{payload}.fake"
+
+
+def read_jwt(token: str) -> dict | None:
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload))
+    except (IndexError, ValueError):
+        return None
+
+
+@dataclass
+class FaultConfig:
+    latency: float = 0.0  # mean latency in seconds
+    jitter: float = 0.0  # +/- seconds
+    error_rate: float = 0.0  # HTTP 500
+    unauthorized_rate: float = 0.0  # HTTP 401 on device endpoints
+    rate_limit_rate: float = 0.0  # HTTP 429 with Retry-After
+    retry_after: int = 5
+    token_ttl: float = 3600.0
+    upload_period: float = 0.0  # s between device uploads, 0 = new sample per request
+    upload_delay: float = 0.0  # s until an upload is readable
+
+
+@dataclass
+class SimulatedCCU:
+    """Telemetry and config state of one simulated CCU."""
+
+    ccu: str
+    rng: random.Random
+    soc: float = 50.0
+    capacity: float = 0.0
+    converters: int = 1
+    batteries: int = 1
+    updated: float = field(default_factory=time.time)
+    config: dict = field(default_factory=dict)
+    # Offset of the uploads within the upload period (0..1) and the last upload
+    phase: float = 0.0
+    upload: dict | None = None
+
+    @classmethod
+    def create(cls, ccu: str) -> "SimulatedCCU":
+        rng = random.Random(ccu)
+        sim = cls(ccu=ccu, rng=rng, soc=rng.uniform(10, 90), phase=rng.random())
+        sim.converters = rng.randint(1, 4)
+        sim.batteries = rng.randint(1, 5)
+        sim.capacity = sim.batteries * 2240.0
+        sim.config = {
+            "deviceId": f"dev-{ccu}",
+            "numberOfBatteries": sim.batteries,
+            "minSOC": 10,
+            "maxSOC": 95,
+            "maxOutputPower": 800,
+            "baseLoad": 0,
+            "threshold": 20,
+            "offlineOutput": 100,
+            "powerMeter": 9,
+            "ccuSpeed": 2,
+            "dcAlgorithm": 1,
+            "meterIp": f"192.168.{rng.randint(0, 254)}.{rng.randint(1, 254)}",
+        }
+        return sim
+
+    def telemetry(self, upload_period: float = 0.0, upload_delay: float = 0.0) -> dict:
+        """Advance the simulation to now (or the last upload) and return a /api/device/last payload."""
+        now = time.time()
+        if upload_period:
+            offset = self.phase * upload_period
+            now = math.floor((now - upload_delay - offset) / upload_period) * upload_period + offset
+            if self.upload is not None and self.upload["date"] == int(now * 1000):
+                return self.upload
+        dt, self.updated = max(0.0, now - self.updated), now
+        # PV bell curve between 6:00 and 20:00 local time plus clouds
+        hour = time.localtime(now).tm_hour + time.localtime(now).tm_min / 60
+        peak = 200.0 * self.converters
+        pv = max(0.0, math.sin(math.pi * (hour - 6) / 14)) * peak if 6 <= hour <= 20 else 0.0
+        pv = max(0.0, pv * self.rng.uniform(0.7, 1.0))
+        load = self.rng.uniform(150, 600)
+        pccu = min(load, pv + (load if self.soc > self.config["minSOC"] else 0))
+        battery = pv - pccu
+        if (battery > 0 and self.soc >= self.config["maxSOC"]) or (battery < 0 and self.soc <= self.config["minSOC"]):
+            battery = 0.0
+            pccu = pv
+        self.soc = min(100.0, max(0.0, self.soc + battery * dt / 3600 / self.capacity * 100))
+        self.upload = {
+            "deviceId": self.config["deviceId"],
+            "date": int(now * 1000),
+            "SOC": round(self.soc, 1),
+            "wifiStrength": self.rng.randint(-80, -40),
+            "Pccu": round(pccu, 1),
+            "Pr": round(load - pccu, 1),
+            "PV_power_total": round(pv, 1),
+            "firmwareVersion": "1.4.2",
+            "convertersInfo": [{"version": f"2.{i}"} for i in range(self.converters)],
+            "batteriesInfo": [{"batteryCapacity": 2240} for _ in range(self.batteries)],
+        }
+        return self.upload
+
+
+class FakeMaxxisunAPI:
+    """aiohttp application simulating the cloud for many CCUs."""
+
+    def __init__(self, faults: FaultConfig | None = None, seed: int = 0):
+        self.faults = faults or FaultConfig()
+        self.rng = random.Random(seed)
+        self.ccus: dict[str, SimulatedCCU] = {}
+        self.requests: Counter = Counter()
+        # Answered telemetry requests per CCU
+        self.polls: Counter = Counter()
+        self.app = web.Application()
+        self.app.add_routes(
+            [
+                web.post("/api/authentication/log-in", self.login),
+                web.get("/api/device/last", self.device_last),
+                web.get("/api/device/config", self.get_config),
+                web.put("/api/device/config", self.put_config),
+                web.get("/_stats", self.stats),
+            ]
+        )
+
+    def _ccu(self, ccu: str) -> SimulatedCCU:
+        if ccu not in self.ccus:
+            self.ccus[ccu] = SimulatedCCU.create(ccu)
+        return self.ccus[ccu]
+
+    async def _delay(self) -> None:
+        delay = self.faults.latency + self.rng.uniform(-self.faults.jitter, self.faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _injected_fault(self, endpoint: str) -> web.Response | None:
+        roll = self.rng.random()
+        if roll < self.faults.rate_limit_rate:
+            self.requests[(endpoint, 429)] += 1
+            return web.json_response(
+                {"error": "rate limited"}, status=429, headers={"Retry-After": str(self.faults.retry_after)}
+            )
+        roll -= self.faults.rate_limit_rate
+        if roll < self.faults.error_rate:
+            self.requests[(endpoint, 500)] += 1
+            return web.json_response({"error": "injected"}, status=500)
+        roll -= self.faults.error_rate
+        if endpoint != "login" and roll < self.faults.unauthorized_rate:
+            self.requests[(endpoint, 401)] += 1
+            return web.json_response({"error": "unauthorized"}, status=401)
+        return None
+
+    def _authorize(self, request: web.Request, endpoint: str) -> SimulatedCCU | web.Response:
+        auth = request.headers.get("Authorization", "")
+        claims = read_jwt(auth.removeprefix("Bearer "))
+        if not claims or claims.get("exp", 0) < time.time():
+            self.requests[(endpoint, 401)] += 1
+            return web.json_response({"error": "unauthorized"}, status=401)
+        return self._ccu(claims["ccu"])
+
+    async def login(self, request: web.Request) -> web.Response:
+        await self._delay()
+        if (fault := self._injected_fault("login")) is not None:
+            return fault
+        body = await request.json()
+        if not body.get("email") or not body.get("ccu"):
+            self.requests[("login", 400)] += 1
+            return web.json_response({"error": "missing email/ccu"}, status=400)
+        self._ccu(body["ccu"])
+        self.requests[("login", 200)] += 1
+        return web.json_response({"jwt": make_jwt(body["ccu"], self.faults.token_ttl)})
+
+    async def device_last(self, request: web.Request) -> web.Response:
+        await self._delay()
+        if (fault := self._injected_fault("last")) is not None:
+            return fault
+        sim = self._authorize(request, "last")
+        if isinstance(sim, web.Response):
+            return sim
+        self.requests[("last", 200)] += 1
+        self.polls[sim.ccu] += 1
+        return web.json_response(sim.telemetry(self.faults.upload_period, self.faults.upload_delay))
+
+    async def get_config(self, request: web.Request) -> web.Response:
+        await self._delay()
+        if (fault := self._injected_fault("config")) is not None:
+            return fault
+        sim = self._authorize(request, "config")
+        if isinstance(sim, web.Response):
+            return sim
+        body = json.dumps(sim.config, sort_keys=True)
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.requests[("config", 304)] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        self.requests[("config", 200)] += 1
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    async def put_config(self, request: web.Request) -> web.Response:
+        await self._delay()
+        if (fault := self._injected_fault("config_put")) is not None:
+            return fault
+        sim = self._authorize(request, "config_put")
+        if isinstance(sim, web.Response):
+            return sim
+        body = await request.json()
+        sim.config.update({k: v for k, v in body.items() if k in sim.config})
+        sim.batteries = int(sim.config["numberOfBatteries"]) or sim.batteries
+        self.requests[("config_put", 200)] += 1
+        return web.json_response(sim.config)
+
+    def request_counts(self) -> dict[str, int]:
+        return {f"{endpoint} {status}": count for (endpoint, status), count in sorted(self.requests.items())}
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"ccus": len(self.ccus), "requests": self.request_counts()})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+        """Start serving; returns the runner and the base URL."""
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # noqa: SLF001 - resolve the ephemeral port
+        port = sockets[0].getsockname()[1]
+        return runner, f"http://{host}:{port}"
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.0, help="mean latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency jitter in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500 responses")
+    parser.add_argument("--unauthorized-rate", type=float, default=0.0, help="share of HTTP 401 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of HTTP 429 responses")
+    parser.add_argument("--retry-after", type=int, default=5, help="Retry-After of injected 429s (s)")
+    parser.add_argument("--token-ttl", type=float, default=3600.0, help="lifetime of issued JWTs (s)")
+    parser.add_argument("--upload-period", type=float, default=0.0, help="s between device uploads (0 = every request)")
+    parser.add_argument("--upload-delay", type=float, default=0.0, help="s until an upload is readable")
+
+
+def faults_from_args(args: argparse.Namespace) -> FaultConfig:
+    return FaultConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        unauthorized_rate=args.unauthorized_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        token_ttl=args.token_ttl,
+        upload_period=args.upload_period,
+        upload_delay=args.upload_delay,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    api = FakeMaxxisunAPI(faults_from_args(args))
+    web.run_app(api.app, host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Load test: N simulated CCUs polled by the integration's coordinators.
+
+Starts the fake API (tools/fake_server.py) in-process, or uses --server,
+sets up one APICoordinator per CCU behind a shared MaxxisunHub and
+reports request counts, poll latency percentiles, event-loop lag, missed
+deadlines, new/repeated samples with their age and memory per CCU as JSON.
+
+    python tools/loadtest.py --ccus 300 --interval 30 --duration 300
+    python tools/loadtest.py --ccus 100 --interval 5 --upload-period 30 --upload-delay 2
+
+Requires Home Assistant to be installed (the integration's runtime).
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "custom_components"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from fake_server import FakeMaxxisunAPI, add_fault_arguments, faults_from_args  # noqa: E402
+from maxxisun_test import auth, coordinator as coordinator_module  # noqa: E402
+from maxxisun_test.coordinator import APICoordinator  # noqa: E402
+from maxxisun_test.hub import MaxxisunHub  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TimedCoordinator(APICoordinator):
+    """APICoordinator that records the duration of every poll."""
+
+    latencies: list[float] = []
+
+    async def _async_update_data(self):
+        start = time.perf_counter()
+        try:
+            return await super()._async_update_data()
+        finally:
+            TimedCoordinator.latencies.append(time.perf_counter() - start)
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: list[float], period: float = 0.1) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(period)
+        lags.append(max(0.0, loop.time() - start - period))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    runner = None
+    api = None
+    if args.server:
+        base_url = args.server.rstrip("/")
+    else:
+        api = FakeMaxxisunAPI(faults_from_args(args))
+        runner, base_url = await api.start()
+    # The integration talks to the module level API_BASE_URL
+    auth.API_BASE_URL = base_url
+    coordinator_module.API_BASE_URL = base_url
+
+    hass = HomeAssistant(args.config_dir)
+    # Token persistence looks up config entries, there are none here
+    hass.config_entries = SimpleNamespace(async_entries=lambda domain=None: [])
+    hub = MaxxisunHub(hass)
+    # The integration's own client (pool, keep-alive, timeouts)
+    session = hub.async_get_session(False)
+
+    tracemalloc.start()
+    coordinators = []
+    for index in range(args.ccus):
+        entry = SimpleNamespace(
+            data={"email": f"user{index}@example.com", "ccu": f"ccu{index:05d}", "token": None, "ignoreSSL": False}
+        )
+        token_manager = hub.async_get_token_manager(entry)
+        coordinator = TimedCoordinator(
+            hass=hass,
+            session=session,
+            token_manager=token_manager,
+            api_poll_interval=args.interval,
+            adaptive_polling=args.adaptive,
+            hub=hub,
+        )
+        coordinators.append(coordinator)
+
+    setup_start = time.perf_counter()
+    # Listen first, like entities do, so every refresh schedules the next one
+    unsubs = [c.async_add_listener(lambda: None) for c in coordinators]
+    await asyncio.gather(*(c.async_refresh() for c in coordinators))
+    setup_time = time.perf_counter() - setup_start
+    # Leave out what the in-process fake server allocated for its CCUs
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, "*fake_server.py"), tracemalloc.Filter(False, "*aiohttp/web*")]
+    )
+    client_memory = sum(stat.size for stat in snapshot.statistics("filename"))
+
+    # Warm-up: let every coordinator settle on its phase slot (and learn uploads)
+    await asyncio.sleep(args.warmup if args.warmup is not None else args.interval * 1.5)
+    TimedCoordinator.latencies.clear()
+    hub.polls = hub.missed_deadlines = 0
+    hub.max_lateness = 0.0
+    for c in coordinators:
+        c.stats.samples = c.stats.duplicates = 0
+        c.stats.sample_ages.clear()
+    lags: list[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lags))
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await lag_task
+
+    for unsub in unsubs:
+        unsub()
+    for c in coordinators:
+        await c.async_shutdown()
+    await hub.async_close()
+    tracemalloc.stop()
+
+    latencies = TimedCoordinator.latencies
+    ages = [age for c in coordinators for age in c.stats.sample_ages]
+    expected = args.ccus * args.duration / args.interval
+    report = {
+        "ccus": args.ccus,
+        "interval": args.interval,
+        "duration": args.duration,
+        "setup_seconds": round(setup_time, 3),
+        "polls": len(latencies),
+        "polls_expected": round(expected),
+        "failed_coordinators": sum(1 for c in coordinators if not c.last_update_success),
+        "poll_latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(max(latencies, default=0) * 1000, 1),
+        },
+        "loop_lag_ms": {
+            "mean": round(statistics.fmean(lags) * 1000, 2) if lags else 0.0,
+            "p99": round(percentile(lags, 99) * 1000, 2),
+            "max": round(max(lags, default=0) * 1000, 2),
+        },
+        "samples": {
+            "new": sum(c.stats.samples for c in coordinators),
+            "duplicates": sum(c.stats.duplicates for c in coordinators),
+            "age_ms": {
+                "p50": round(percentile(ages, 50) * 1000, 1),
+                "p95": round(percentile(ages, 95) * 1000, 1),
+            },
+            "upload_period_learned": sum(1 for c in coordinators if c.uploads.period is not None),
+        },
+        "memory_per_ccu_kib": round(client_memory / args.ccus / 1024, 1),
+        "hub": hub.stats(),
+    }
+    if api is not None:
+        report["requests"] = api.request_counts()
+        await runner.cleanup()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ccus", type=int, default=100)
+    parser.add_argument("--interval", type=int, default=30, help="poll interval (s)")
+    parser.add_argument("--duration", type=float, default=120, help="measurement time (s)")
+    parser.add_argument("--adaptive", action="store_true", help="enable adaptive polling")
+    parser.add_argument("--warmup", type=float, help="s before measuring (default 1.5 intervals)")
+    parser.add_argument("--server", help="use a running fake server instead of an in-process one")
+    parser.add_argument("--config-dir", default=".", help="Home Assistant config dir (unused, required by core)")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()